@@ -16,5 +16,10 @@ except Exception as e:
 
 # This is required for Vercel to find the app instance
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    try:
+        from backend.main import serve
+    except Exception:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+    else:
+        serve()
@@ -0,0 +1,55 @@
+"""
+Categorical dimension benchmark.
+
+Compares the categorical dimension columns the loader produces against the
+same columns as plain object strings: deep memory use, a groupby and an
+equality filter on each table.
+
+    python -m backend.benchmarks.categoricals [Sales&ClaimsData.xls] [--rounds 20]
+"""
+
+import argparse
+
+import pandas as pd
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, timed
+from backend.core.data_manager import DataManager
+
+
+def _as_objects(df: pd.DataFrame) -> pd.DataFrame:
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return df.astype({c: object for c in cats})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    dm = DataManager()
+    dm.load_excel(file_path=args.data_file)
+
+    for table, df in (('sales', dm.sales_df), ('claims', dm.claims_df)):
+        cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+        if not cats:
+            print(f"{table}: no categorical columns")
+            continue
+        plain = _as_objects(df)
+        cat_mb = df[cats].memory_usage(deep=True).sum() / 2**20
+        obj_mb = plain[cats].memory_usage(deep=True).sum() / 2**20
+        print(f"{table}: {len(df):,} rows, {len(cats)} categorical columns "
+              f"{cat_mb:.1f} MiB vs {obj_mb:.1f} MiB as objects ({obj_mb / max(cat_mb, 1e-9):.1f}x)")
+
+        key = cats[0]
+        value_col = next((c for c in df.select_dtypes('number').columns if c != '_row_id'), '_row_id')
+        probe = df[key].dropna().iloc[0] if df[key].notna().any() else None
+        for label, frame in (('categorical', df), ('object', plain)):
+            group = timed(lambda: frame.groupby(key, observed=True)[value_col].sum(), args.rounds)
+            match = timed(lambda: (frame[key] == probe).to_numpy().nonzero(), args.rounds)
+            print(f"   groupby {key!r:<16} {label:<12} {describe(group)}")
+            print(f"   filter  {key!r:<16} {label:<12} {describe(match)}")
+
+
+if __name__ == '__main__':
+    main()
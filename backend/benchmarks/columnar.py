@@ -0,0 +1,60 @@
+"""
+Columnar chart response benchmark.
+
+Compares each chart endpoint's default records response with
+``format=columnar``: encoded size, gzip size (what a compressing proxy would
+send) and time to encode the already-computed result. Also checks the
+columnar form rebuilds the same records.
+
+    python -m backend.benchmarks.columnar [Sales&ClaimsData.xls] [--rounds 50]
+"""
+
+import argparse
+import gzip
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, make_client, timed
+from backend.core import serialize
+
+PATHS = [
+    '/api/sales/monthly', '/api/sales/dealers', '/api/sales/products', '/api/sales/vehicles',
+    '/api/claims/status', '/api/claims/parts', '/api/claims/trends', '/api/correlations',
+    '/api/dashboard',
+]
+
+
+def _rows(value):
+    """Undo ``as_columnar``: columnar tables (at any depth) back to records."""
+    if isinstance(value, dict) and set(value) == {'columns', 'data'}:
+        columns, data = value['columns'], value['data']
+        length = len(data[columns[0]]) if columns else 0
+        return [{col: data[col][i] for col in columns} for i in range(length)]
+    if isinstance(value, dict):
+        return {key: _rows(item) for key, item in value.items()}
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    client = make_client(args.data_file)
+    print(f"encoder: {'orjson' if serialize.FAST_JSON else 'json (stdlib)'}")
+
+    for path in PATHS:
+        plain = client.get(path)
+        columnar = client.get(f'{path}?format=columnar')
+        plain.raise_for_status()
+        columnar.raise_for_status()
+        records = plain.json()
+        status = 'same records' if _rows(columnar.json()) == records else 'MISMATCH'
+        print(f"   {path:<22} records  {len(plain.content):>7,} B  gzip {len(gzip.compress(plain.content)):>6,} B"
+              f"  encode {describe(timed(lambda: serialize.dumps(records), args.rounds))}")
+        print(f"   {'':<22} columnar {len(columnar.content):>7,} B  gzip {len(gzip.compress(columnar.content)):>6,} B"
+              f"  encode {describe(timed(lambda: serialize.dumps(serialize.as_columnar(records)), args.rounds))}"
+              f"  ({status})")
+
+
+if __name__ == '__main__':
+    main()
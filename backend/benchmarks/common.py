@@ -0,0 +1,78 @@
+"""Shared helpers for the backend benchmark scripts."""
+
+import os
+import statistics
+import sys
+import time
+
+# Allow running as a plain script from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+DEFAULT_DATA_FILE = 'Sales&ClaimsData.xls'
+
+# The per-widget requests a dashboard refresh used to issue (now batched as /api/dashboard)
+DASHBOARD_REQUESTS = [
+    ('/api/summary', True),
+    ('/api/filters', False),
+    ('/api/sales/monthly', True),
+    ('/api/sales/dealers', True),
+    ('/api/sales/products', True),
+    ('/api/sales/vehicles', True),
+    ('/api/claims/status', True),
+    ('/api/claims/parts', True),
+    ('/api/claims/trends', True),
+    ('/api/claims/recent', True),
+    ('/api/correlations', True),
+    ('/api/insights', True),
+    ('/api/validate', False),
+]
+
+
+def make_client(data_file: str):
+    """Load ``data_file`` into the app's DataManager and return a TestClient."""
+    from fastapi.testclient import TestClient  # needs httpx
+    from backend import main
+
+    main.data_manager.load_excel(file_path=data_file)
+    return TestClient(main.app)
+
+
+def default_date_window(client) -> dict:
+    """The 6-month window the dashboard applies on first load."""
+    import pandas as pd
+
+    max_date = client.get('/api/status').json().get('maxDate')
+    if not max_date:
+        return {}
+    end = pd.Timestamp(max_date)
+    return {'date_from': (end - pd.DateOffset(months=6)).strftime('%Y-%m-%d'),
+            'date_to': end.strftime('%Y-%m-%d')}
+
+
+def refresh(client, filters: dict, batched: bool = False):
+    """Issue one dashboard refresh; raises if any request fails."""
+    from urllib.parse import urlencode
+
+    qs = ('?' + urlencode(filters)) if filters else ''
+    if batched:
+        client.get('/api/dashboard' + qs).raise_for_status()
+        return
+    for path, filtered in DASHBOARD_REQUESTS:
+        r = client.get(path + (qs if filtered else ''))
+        r.raise_for_status()
+
+
+def timed(fn, rounds: int) -> list[float]:
+    """Run ``fn`` ``rounds`` times and return wall times in milliseconds."""
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def describe(times: list[float]) -> str:
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f"mean {statistics.mean(times):8.1f} ms   p50 {statistics.median(times):8.1f} ms   p95 {p95:8.1f} ms"
@@ -0,0 +1,65 @@
+"""
+Aggregate cube benchmark.
+
+Times the monthly sales aggregation and the KPI totals answered from the
+aggregate cube against the same queries scanning the filtered rows, for the
+filter shapes the dashboard sends. Also reports what building the cube costs.
+
+    python -m backend.benchmarks.cube [Sales&ClaimsData.xls] [--rounds 20]
+"""
+
+import argparse
+
+import pandas as pd
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, timed
+from backend.core.cube import AggregateCube
+from backend.core.data_manager import DataManager
+from backend.core.utils import filter_rows, filter_view
+
+MONTHLY = {
+    'premium': ('Gross Premium', 'sum'),
+    'riskPremium': ('Risk Premium', 'sum'),
+    'policies': ('Policy No', 'count'),
+}
+
+
+def _filter_sets(df) -> dict[str, dict]:
+    end = df['Policy Sold Date'].max() if 'Policy Sold Date' in df.columns else None
+    sets = {'none': {}}
+    if 'Dealer' in df.columns and df['Dealer'].notna().any():
+        sets['dealer'] = {'dealer': str(df['Dealer'].dropna().iloc[0])}
+    if end is not None:
+        sets['6 months'] = {'date_from': (end - pd.DateOffset(months=6)).strftime('%Y-%m-%d'),
+                            'date_to': end.strftime('%Y-%m-%d')}
+    return sets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    dm = DataManager()
+    dm.load_excel(file_path=args.data_file)
+    df = dm.sales_df
+
+    build = timed(lambda: AggregateCube(df), max(1, args.rounds // 4))
+    cube = AggregateCube(df)
+    print(f"sales: {len(df):,} rows in {len(cube.rows):,} cells, build {describe(build)}")
+
+    named = {k: v for k, v in MONTHLY.items() if v[0] in df.columns}
+    for label, filters in _filter_sets(df).items():
+        rows = lambda: filter_rows(df, filters)
+        cube_times = timed(lambda: cube.aggregate(df, filters, ['Year', 'Month'], named, rows), args.rounds)
+        scan_times = timed(lambda: filter_view(df, filters).groupby(['Year', 'Month'], observed=True)
+                           .agg(**named), args.rounds)
+        total_times = timed(lambda: cube.totals(df, filters, named, rows), args.rounds)
+        print(f"   {label:<10} monthly cube {describe(cube_times)}")
+        print(f"   {label:<10} monthly scan {describe(scan_times)}")
+        print(f"   {label:<10} totals  cube {describe(total_times)}")
+
+
+if __name__ == '__main__':
+    main()
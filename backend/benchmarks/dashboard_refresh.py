@@ -0,0 +1,51 @@
+"""
+Dashboard refresh benchmark.
+
+Replays a dashboard refresh against the in-process app, both as the 13
+per-widget requests and as one batched ``/api/dashboard`` call, and reports
+per-refresh latency and peak allocation.
+
+    python -m backend.benchmarks.dashboard_refresh [Sales&ClaimsData.xls] [--rounds 20]
+"""
+
+import argparse
+import resource
+import tracemalloc
+
+from backend.benchmarks.common import (
+    DEFAULT_DATA_FILE, default_date_window, describe, make_client, refresh, timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    client = make_client(args.data_file)
+    window = default_date_window(client)
+    scenarios = {
+        'no filters': {},
+        'default 6-month window': window,
+        'window + dealer': dict(window, dealer=client.get('/api/filters').json().get('dealers', ['All'])[0]),
+    }
+
+    for name, filters in scenarios.items():
+        for batched in (False, True):
+            label = f"{name} ({'batched' if batched else '13 calls'})"
+            refresh(client, filters, batched)  # warm up
+            times = timed(lambda: refresh(client, filters, batched), args.rounds)
+
+            tracemalloc.start()
+            refresh(client, filters, batched)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{label:<36} {describe(times)}   peak alloc {peak / 2**20:7.1f} MiB")
+
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
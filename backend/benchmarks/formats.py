@@ -0,0 +1,70 @@
+"""
+Ingestion format benchmark.
+
+Writes the workbook's Sales and Claims sheets out as CSV (and Parquet and
+Arrow when pyarrow is installed), then times a full DataManager load from
+each format against the Excel parse and checks every format yields the same
+normalized frames.
+
+    python -m backend.benchmarks.formats [Sales&ClaimsData.xls] [--rounds 3]
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, timed
+from backend.core import ingest, snapshot
+from backend.core.data_manager import DataManager
+
+WRITERS = {
+    'csv': lambda df, path: df.to_csv(path, index=False),
+    'parquet': lambda df, path: df.to_parquet(path, index=False),
+    'arrow': lambda df, path: df.to_feather(path),
+}
+
+
+def _difference(expected: DataManager, actual: DataManager) -> str:
+    for table in ('original_sales_df', 'original_claims_df'):
+        try:
+            pd.testing.assert_frame_equal(getattr(expected, table), getattr(actual, table))
+        except AssertionError as e:
+            return f"{table}: {str(e).splitlines()[0]}"
+    return 'identical frames'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    # Time real parses, not snapshot hits
+    snapshot.SNAPSHOTS_ENABLED = False
+
+    excel = DataManager()
+    times = timed(lambda: excel.load_excel(file_path=args.data_file), args.rounds)
+    print(f"excel    {describe(times)}   {len(excel.sales_df):,} sales / {len(excel.claims_df):,} claims rows")
+
+    with pd.ExcelFile(args.data_file) as xls:
+        sheets = DataManager.pick_sheets(xls.sheet_names)
+        raw = [pd.read_excel(xls, sheet) for sheet in sheets]
+
+    formats = ['csv'] + (['parquet', 'arrow'] if ingest._has_pyarrow() else [])
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            paths = [os.path.join(directory, f'{table}.{fmt}') for table in ('sales', 'claims')]
+            for df, path in zip(raw, paths):
+                WRITERS[fmt](df, path)
+            dm = DataManager()
+            times = timed(lambda: dm.load_tables(*paths), args.rounds)
+            size_mb = sum(os.path.getsize(p) for p in paths) / 2**20
+            print(f"{fmt:<8} {describe(times)}   {size_mb:.1f} MiB, {_difference(excel, dm)}")
+    if len(formats) == 1:
+        print("(install pyarrow for multithreaded CSV and the Parquet/Arrow formats)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+JSON response encoding benchmark.
+
+Measures CPU time per request (process time, so waiting on the pool doesn't
+count) for a 500-row raw-data page and the correlations metric, then splits
+out the encoding: a raw page turned into records by the old
+``where``/``replace``/``to_dict`` pass against ``serialize.records``, and
+results encoded FastAPI's way (``jsonable_encoder`` + ``json.dumps``)
+against ``serialize.dumps``.
+
+    python -m backend.benchmarks.json_encoding [Sales&ClaimsData.xls] [--rounds 50]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, make_client, timed
+from backend.core import serialize
+
+REQUESTS = ['/api/data/sales?limit=500', '/api/correlations']
+
+
+def _cpu_timed(fn, rounds: int) -> list[float]:
+    """Like ``timed`` but in CPU milliseconds of this process."""
+    times = []
+    for _ in range(rounds):
+        t0 = time.process_time()
+        fn()
+        times.append((time.process_time() - t0) * 1000)
+    return times
+
+
+def _legacy_records(result: pd.DataFrame) -> list[dict]:
+    """How raw-data pages were converted before ``serialize.records``."""
+    for col in result.columns:
+        if result[col].dtype == 'datetime64[ns]':
+            result[col] = result[col].dt.strftime('%Y-%m-%d')
+        elif isinstance(result[col].dtype, pd.CategoricalDtype):
+            result[col] = result[col].astype(object)
+    result = result.where(pd.notnull(result), None)
+    result = result.replace([np.inf, -np.inf], None)
+    return result.to_dict('records')
+
+
+def _generic_dumps(value) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    client = make_client(args.data_file)
+    from backend import main as app_main
+    dm = app_main.data_manager
+    print(f"encoder: {'orjson' if serialize.FAST_JSON else 'json (stdlib)'}")
+
+    for path in REQUESTS:
+        def request():
+            client.get(path).raise_for_status()
+        request()
+        print(f"   GET {path:<28} CPU {describe(_cpu_timed(request, args.rounds))}")
+
+    page = dm.sales_df.iloc[:500]
+    legacy = _cpu_timed(lambda: _legacy_records(page.copy()), args.rounds)
+    current = _cpu_timed(lambda: serialize.records(page), args.rounds)
+    print(f"   500-row page to records  legacy  {describe(legacy)}")
+    print(f"   {'':<24} columns {describe(current)}")
+
+    payloads = {'raw page': serialize.records(page), 'correlations': client.get('/api/correlations').json()}
+    for name, value in payloads.items():
+        print(f"   encode {name:<17} generic {describe(timed(lambda: _generic_dumps(value), args.rounds))}")
+        print(f"   {'':<24} dumps   {describe(timed(lambda: serialize.dumps(value), args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
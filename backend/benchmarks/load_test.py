@@ -0,0 +1,107 @@
+"""
+Concurrent dashboard load test.
+
+Serves the app with uvicorn in-process and fires ``--clients`` concurrent
+``/api/dashboard`` refreshes (each with its own dealer filter, so they miss
+the result cache) while a probe polls ``/api/status``. Runs once with the
+analytics executed inline on the event loop, as before the worker pool, and
+once on the pool, reporting refresh and probe latency percentiles and the
+pool's queue counters.
+
+    python -m backend.benchmarks.load_test [Sales&ClaimsData.xls] [--clients 50] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, default_date_window
+
+
+def _percentiles(times: list[float]) -> str:
+    times = sorted(times)
+    pick = lambda q: times[min(len(times) - 1, int(len(times) * q))]
+    return f"p50 {pick(0.50):8.1f} ms   p95 {pick(0.95):8.1f} ms   p99 {pick(0.99):8.1f} ms"
+
+
+def _serve(app) -> tuple[str, object]:
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f'http://127.0.0.1:{port}', server
+
+
+async def _run(base_url: str, filter_sets: list[dict], rounds: int) -> tuple[list[float], list[float]]:
+    import httpx
+
+    refreshes, probes = [], []
+    done = asyncio.Event()
+
+    async def refresh(client, filters):
+        t0 = time.perf_counter()
+        r = await client.get('/api/dashboard', params=filters)
+        r.raise_for_status()
+        refreshes.append((time.perf_counter() - t0) * 1000)
+
+    async def probe(client):
+        while not done.is_set():
+            t0 = time.perf_counter()
+            (await client.get('/api/status')).raise_for_status()
+            probes.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=len(filter_sets) + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+        prober = asyncio.create_task(probe(client))
+        for _ in range(rounds):
+            await asyncio.gather(*(refresh(client, f) for f in filter_sets))
+        done.set()
+        await prober
+    return refreshes, probes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    from backend import main as app_main
+    from backend.core.workers import WorkerPool, data_lock
+
+    app_main.data_manager.load_excel(file_path=args.data_file)
+    base_url, server = _serve(app_main.app)
+
+    import httpx
+    window = default_date_window(httpx.Client(base_url=base_url))
+    dealers = app_main.data_manager.get_filter_options().get('dealers') or ['']
+    filter_sets = [dict(window, dealer=dealers[i % len(dealers)]) if dealers[0] else dict(window)
+                   for i in range(args.clients)]
+    print(f"{args.clients} concurrent refreshes x {args.rounds} rounds, "
+          f"{len(app_main.data_manager.sales_df):,} sales rows")
+
+    pooled = app_main.analytics
+    for label, pool in (('inline', WorkerPool('analytics', 0, lock=data_lock)), ('pooled', pooled)):
+        app_main.analytics = pool
+        app_main.data_manager.clear_cache()
+        refreshes, probes = asyncio.run(_run(base_url, filter_sets, args.rounds))
+        stats = pool.stats()
+        print(f"{label:<7} refresh {_percentiles(refreshes)}")
+        print(f"{label:<7} status  {_percentiles(probes)}")
+        print(f"{'':<7} {stats['threads']} threads, peak queue {stats['peakQueued']}, "
+              f"rejected {stats['rejected']}, avg wait {stats['avgWaitMs']} ms, avg run {stats['avgRunMs']} ms")
+    app_main.analytics = pooled
+    server.should_exit = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Sorted raw-data paging benchmark.
+
+Pages through the Data Manager grid sorted by a few columns and times the
+row ordering alone (serializing the rows is the same either way): a full
+re-sort per page, as ``get_raw_data`` used to do, against the memoized sort
+orders, for the first page from a cold memo (partial sort) and for paging on.
+
+    python -m backend.benchmarks.raw_paging [Sales&ClaimsData.xls] [--pages 10] [--rounds 5]
+"""
+
+import argparse
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE, describe, timed
+from backend.core.data_manager import DataManager
+from backend.core.indexes import get_index
+from backend.core.utils import filter_view
+
+
+def _resorted_page(df, page: int, limit: int, sort_by: str, ascending: bool):
+    view = filter_view(df, {}).sort_values(sort_by, ascending=ascending)
+    return view.slice((page - 1) * limit, page * limit).positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    dm = DataManager()
+    dm.load_excel(file_path=args.data_file)
+
+    for table, df in (('sales', dm.sales_df), ('claims', dm.claims_df)):
+        if df is None:
+            continue
+        index = get_index(df)
+        columns = [c for c in df.columns if c != '_row_id'][:3]
+        print(f"{table}: {len(df):,} rows")
+        for sort_by in columns:
+            for sort_dir in ('asc', 'desc'):
+                ascending = sort_dir == 'asc'
+
+                def resort():
+                    for page in range(1, args.pages + 1):
+                        _resorted_page(df, page, 100, sort_by, ascending)
+
+                def first_page():
+                    index._orders.clear()
+                    index.sorted_rows({}, sort_by, ascending, 100)[:100]
+
+                def paging():
+                    index._orders.clear()
+                    for page in range(1, args.pages + 1):
+                        index.sorted_rows({}, sort_by, ascending, page * 100)[(page - 1) * 100:page * 100]
+
+                print(f"   {sort_by!r:<24} {sort_dir:<4} re-sort {args.pages} pages  {describe(timed(resort, args.rounds))}")
+                print(f"   {'':<24} {'':<4} first page cold   {describe(timed(first_page, args.rounds))}")
+                print(f"   {'':<24} {'':<4} memoized {args.pages} pages {describe(timed(paging, args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared dataset memory benchmark.
+
+Starts 1, 2 and 4 worker processes that each load the workbook privately (as
+separate uvicorn workers did) or attach to one shared generation, touches all
+of their data, and reports the memory the data adds: per process (RSS) and in
+total, with pages shared between processes counted once (summed PSS). Linux only.
+
+    python -m backend.benchmarks.shared_memory [Sales&ClaimsData.xls] [--workers 1 2 4]
+"""
+
+import argparse
+import multiprocessing as mp
+import shutil
+import tempfile
+
+import numpy as np
+
+from backend.benchmarks.common import DEFAULT_DATA_FILE
+
+
+def _memory_kb() -> dict:
+    with open('/proc/self/smaps_rollup') as f:
+        fields = dict(line.split(':', 1) for line in f if ':' in line)
+    return {key: int(fields[key].split()[0]) for key in ('Rss', 'Pss')}
+
+
+def _worker(data_file: str, root, loaded, measured, results):
+    from backend.core.data_manager import DataManager
+    from backend.core.shared import SharedDataset
+
+    dm = DataManager()
+    before = _memory_kb()
+    if root is None:
+        dm.load_excel(file_path=data_file)
+    else:
+        SharedDataset(root, run='benchmark').load(dm, lambda: dm.load_excel(file_path=data_file))
+    # Fault in every column's pages, as serving requests eventually does
+    for df in (dm.sales_df, dm.claims_df, dm.merged_df):
+        for col in df.columns:
+            values = df[col].array.codes if df[col].dtype == 'category' else df[col].to_numpy()
+            if values.dtype != object:
+                values.view(np.uint8).sum()
+    loaded.wait()
+    after = _memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    measured.wait()
+
+
+def _measure(data_file: str, workers: int, shared: bool) -> list[dict]:
+    ctx = mp.get_context('spawn')
+    root = tempfile.mkdtemp(prefix='clarity-shared-bench-') if shared else None
+    loaded, measured, results = ctx.Barrier(workers), ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(data_file, root, loaded, measured, results))
+             for _ in range(workers)]
+    try:
+        for p in procs:
+            p.start()
+        usage = [results.get() for _ in procs]
+        measured.wait()
+        for p in procs:
+            p.join()
+        return usage
+    finally:
+        if root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_file', nargs='?', default=DEFAULT_DATA_FILE)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    for shared in (False, True):
+        for workers in args.workers:
+            usage = _measure(args.data_file, workers, shared)
+            rss = sum(u['Rss'] for u in usage) / len(usage) / 1024
+            pss = sum(u['Pss'] for u in usage) / 1024
+            print(f"{'shared' if shared else 'private':<8} {workers} workers   "
+                  f"data RSS per worker {rss:7.1f} MiB   total data PSS {pss:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
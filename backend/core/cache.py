@@ -0,0 +1,142 @@
+"""
+Bounded result cache for metric payloads.
+
+Entries are evicted least-recently-used first once the cache exceeds its entry
+count or memory budget, and expire after a TTL. An entry's size is the length
+of its JSON serialization, which tracks what the payload costs to keep and to
+send far better than ``sys.getsizeof``. Results must be treated as read-only
+by callers since the same object is handed out on every hit.
+
+Entries may declare the table columns they were computed from; an edit then
+invalidates only the entries that read the touched column, while entries with
+no declared dependencies are dropped on any change.
+
+The cache may be shared by worker threads; bookkeeping is serialized, but
+results are computed outside the lock, so two threads missing the same key
+may both compute it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# table -> columns read, or None for every column of that table
+Dependencies = dict[str, Optional[frozenset]]
+
+_MISSING = object()
+
+CACHE_MAX_ENTRIES = int(os.environ.get('CLARITY_CACHE_MAX_ENTRIES', '512'))
+CACHE_MAX_BYTES = int(os.environ.get('CLARITY_CACHE_MAX_MB', '64')) * 2**20
+CACHE_TTL_SECONDS = float(os.environ.get('CLARITY_CACHE_TTL', '600'))
+
+
+def payload_size(value: Any) -> int:
+    """Approximate size of a result as its serialized JSON length."""
+    return len(json.dumps(value, default=str))
+
+
+class ResultCache:
+    """LRU + TTL cache with a byte budget, column dependencies and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl: Optional[float] = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float, Optional[Dependencies]]] = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, deps: Optional[Dependencies] = None) -> Any:
+        """Store ``value`` (skipped if it alone exceeds the budget) and return it."""
+        size = payload_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size, time.monotonic(), deps)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return value
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       deps: Optional[Dependencies] = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, compute(), deps)
+        return value
+
+    def invalidate(self, table: str, column: Optional[str] = None) -> int:
+        """Drop entries that read ``table`` (``column`` of it, if given). Returns the count."""
+        with self._lock:
+            stale = []
+            for key, (_, _, _, deps) in self._entries.items():
+                if deps is None:
+                    stale.append(key)
+                elif table in deps:
+                    cols = deps[table]
+                    if column is None or cols is None or column in cols:
+                        stale.append(key)
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def _drop(self, key: Hashable):
+        size = self._entries.pop(key)[1]
+        self.bytes -= size
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
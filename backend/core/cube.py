@@ -0,0 +1,301 @@
+"""
+Pre-aggregated monthly cube over a table's dimension columns.
+
+Most metrics are sums and counts grouped by a few dimensions, under filters
+that are dimension equalities plus a date range. An ``AggregateCube`` groups
+its table once by every filterable dimension (Year, Month, Dealer, Product,
+Make, Claim Status), Part Type and the calendar month of the date column, and
+keeps per cell the row count plus the sum and non-null count of each measure
+column. ``aggregate`` and ``totals`` then answer a filtered groupby from the
+cells instead of the rows.
+
+A date bound that falls inside a month can't be answered from that month's
+cell, so rows of such straddled months are taken from the regular row filter
+and added on top. ``search`` filters and aggregations the cube doesn't keep
+return None, and callers fall back to scanning rows. Cubes hang off the
+table's ``TableIndex``, which patches them on edits: the edited rows are moved
+to their new cells and only the cells involved are recounted.
+"""
+
+import os
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.core.utils import (
+    DATE_FILTER_COLUMNS, EQUALITY_FILTERS, filter_value, find_column, parse_date_bound,
+)
+
+CUBE_ENABLED = os.environ.get('CLARITY_CUBE', '1') != '0'
+
+# Grouped by metrics without being filterable
+CUBE_GROUP_COLUMNS = ['Part Type']
+# Summed (when numeric) and counted per cell
+CUBE_MEASURES = [
+    'Gross Premium', 'Risk Premium', 'Total Auth Amount', 'Labor', 'Parts',
+    'Policy No', 'has_claim', 'total_claim_amount',
+]
+# Bucket of rows without a date
+NAT_BUCKET = np.iinfo(np.int64).min
+
+_AGGREGATIONS = {'sum', 'count', 'mean', 'size', 'nunique'}
+
+
+def _plain(value):
+    """Hashable, comparable form of a cell value; missing values become None."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return None if pd.isna(value) else value
+
+
+def _month_buckets(dates: np.ndarray) -> np.ndarray:
+    buckets = dates.astype('datetime64[M]').astype(np.int64)
+    buckets[np.isnat(dates)] = NAT_BUCKET
+    return buckets
+
+
+class AggregateCube:
+    """Per-cell row counts, sums and non-null counts, patched on edits."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self.filter_columns = {key: find_column(df, candidates) for key, candidates, _ in EQUALITY_FILTERS}
+        self.dims = list(dict.fromkeys(
+            c for c in list(self.filter_columns.values()) + CUBE_GROUP_COLUMNS if c and c in df.columns
+        ))
+        self.date_column = find_column(df, DATE_FILTER_COLUMNS)
+        self.dated = bool(self.date_column) and pd.api.types.is_datetime64_dtype(df[self.date_column])
+        self.measures = [c for c in CUBE_MEASURES if c in df.columns]
+        self.kinds = {c: df[c].dtype.kind for c in self.measures}
+        self.summed = [c for c in self.measures if self.kinds[c] in 'biuf']
+        self._build(df)
+
+    # ─── Building & Patching ───────────────────────────────────
+
+    def _row_buckets(self, df: pd.DataFrame) -> np.ndarray:
+        if not self.dated:
+            return np.full(len(df), NAT_BUCKET, dtype=np.int64)
+        return _month_buckets(df[self.date_column].to_numpy())
+
+    def _build(self, df: pd.DataFrame):
+        buckets = self._row_buckets(df)
+        keys = [df[d] for d in self.dims] + [pd.Series(buckets, index=df.index)]
+        groups = df.groupby(keys, observed=True, dropna=False, sort=False).ngroup()
+        self.row_cell = groups.to_numpy(np.int64, copy=True)
+        n_cells = int(self.row_cell.max()) + 1 if len(self.row_cell) else 0
+        _, first = np.unique(self.row_cell, return_index=True)
+
+        self.values = {d: np.array([_plain(v) for v in df[d].take(first).tolist()], dtype=object)
+                       for d in self.dims}
+        self.cell_bucket = buckets[first]
+        self.cells = {self._cell_key(i): i for i in range(n_cells)}
+
+        # Earliest and latest date seen per month; only ever widened by edits
+        self.bounds: dict[int, list] = {}
+        if self.dated and len(df):
+            dates = pd.Series(df[self.date_column].to_numpy()).groupby(buckets).agg(['min', 'max'])
+            for bucket, lo, hi in zip(dates.index, dates['min'], dates['max']):
+                if bucket != NAT_BUCKET:
+                    self.bounds[int(bucket)] = [lo.to_datetime64(), hi.to_datetime64()]
+
+        self.rows = np.zeros(n_cells, dtype=np.int64)
+        self.sums = {c: np.zeros(n_cells) for c in self.summed}
+        self.counts = {c: np.zeros(n_cells, dtype=np.int64) for c in self.measures}
+        self._recount(df, np.arange(n_cells), np.arange(len(df)))
+
+    def _cell_key(self, cell: int) -> tuple:
+        return tuple(self.values[d][cell] for d in self.dims) + (int(self.cell_bucket[cell]),)
+
+    def _recount(self, df: pd.DataFrame, cells: np.ndarray, positions: Optional[np.ndarray] = None):
+        """Recompute ``cells`` from their rows (``positions``, if already known)."""
+        if positions is None:
+            positions = np.flatnonzero(np.isin(self.row_cell, cells))
+        local = self.row_cell[positions]
+        n = len(self.rows)
+        self.rows[cells] = np.bincount(local, minlength=n)[cells]
+        for col in self.measures:
+            values = df[col].take(positions)
+            present = values.notna().to_numpy()
+            self.counts[col][cells] = np.bincount(local[present], minlength=n)[cells]
+            if col in self.sums:
+                weights = values.to_numpy(dtype=np.float64, na_value=0.0)[present]
+                self.sums[col][cells] = np.bincount(local[present], weights=weights, minlength=n)[cells]
+
+    def _add_cell(self, key: tuple) -> int:
+        cell = len(self.rows)
+        for d, value in zip(self.dims, key):
+            self.values[d] = np.append(self.values[d], np.array([value], dtype=object))
+        self.cell_bucket = np.append(self.cell_bucket, key[-1])
+        self.rows = np.append(self.rows, 0)
+        for col in self.sums:
+            self.sums[col] = np.append(self.sums[col], 0.0)
+        for col in self.counts:
+            self.counts[col] = np.append(self.counts[col], 0)
+        self.cells[key] = cell
+        return cell
+
+    def update(self, df: pd.DataFrame, positions: np.ndarray, column: str) -> bool:
+        """Patch the cube after cells of ``column`` changed; False if it must be rebuilt."""
+        is_dim = column in self.dims or (self.dated and column == self.date_column)
+        if not is_dim and column not in self.measures:
+            return True
+        if column in self.measures and df[column].dtype.kind != self.kinds[column]:
+            return False
+        if column == self.date_column and self.dated and not pd.api.types.is_datetime64_dtype(df[column]):
+            return False
+
+        positions = np.asarray(positions, dtype=np.int64)
+        affected = set(self.row_cell[positions].tolist())
+        if is_dim:
+            dates = df[self.date_column].take(positions).to_numpy() if self.dated else None
+            buckets = _month_buckets(dates) if self.dated else np.full(len(positions), NAT_BUCKET)
+            for i, position in enumerate(positions.tolist()):
+                bucket = int(buckets[i])
+                key = tuple(_plain(df[d].iat[position]) for d in self.dims) + (bucket,)
+                cell = self.cells.get(key)
+                if cell is None:
+                    cell = self._add_cell(key)
+                self.row_cell[position] = cell
+                affected.add(cell)
+                if bucket != NAT_BUCKET:
+                    bound = self.bounds.setdefault(bucket, [dates[i], dates[i]])
+                    bound[0], bound[1] = min(bound[0], dates[i]), max(bound[1], dates[i])
+        self._recount(df, np.fromiter(affected, dtype=np.int64, count=len(affected)))
+        return True
+
+    # ─── Queries ───────────────────────────────────────────────
+
+    def _select(self, filters: dict, rows: Callable[[], Optional[np.ndarray]]):
+        """Cells fully matching ``filters`` and positions of matching rows in straddled months."""
+        if filters.get('search'):
+            return None
+        mask = self.rows > 0
+        for key, _, cast in EQUALITY_FILTERS:
+            value = filter_value(filters, key, cast)
+            col = self.filter_columns[key]
+            if value is not None and col:
+                mask &= self.values[col] == value
+
+        residual = np.empty(0, dtype=np.int64)
+        if self.date_column and (filters.get('date_from') or filters.get('date_to')):
+            if not self.dated:
+                return None
+            lo = parse_date_bound(filters.get('date_from'))
+            hi = parse_date_bound(filters.get('date_to'))
+            if lo is not None or hi is not None:
+                lo = None if lo is None else lo.to_datetime64()
+                hi = None if hi is None else hi.to_datetime64()
+                inside, straddled = [], []
+                for bucket, (first, last) in self.bounds.items():
+                    if (lo is None or first >= lo) and (hi is None or last <= hi):
+                        inside.append(bucket)
+                    elif (lo is None or last >= lo) and (hi is None or first <= hi):
+                        straddled.append(bucket)
+                cell_inside = np.isin(self.cell_bucket, inside)
+                if straddled and (mask & np.isin(self.cell_bucket, straddled)).any():
+                    positions = rows()
+                    positions = np.arange(self.n_rows) if positions is None else positions
+                    row_buckets = self.cell_bucket[self.row_cell[positions]]
+                    residual = positions[np.isin(row_buckets, straddled)]
+                mask &= cell_inside
+        return np.flatnonzero(mask), residual
+
+    def _parts(self, df: pd.DataFrame, filters: dict, columns: list[str], named: dict,
+               rows: Callable[[], Optional[np.ndarray]]) -> Optional[pd.DataFrame]:
+        """One line per matching cell (and straddled-month row): ``columns`` plus the partial sums."""
+        needed = {'_rows'}
+        for col, func in named.values():
+            if func not in _AGGREGATIONS:
+                return None
+            if func in ('sum', 'mean') and col not in self.sums:
+                return None
+            if func in ('count', 'mean') and col not in self.measures and col not in self.dims:
+                return None
+            if func == 'nunique' and col not in self.dims:
+                return None
+            if func == 'size' and col not in df.columns:
+                return None
+            if func in ('sum', 'mean'):
+                needed.add(f'{col}:sum')
+            if func in ('count', 'mean'):
+                needed.add(f'{col}:count')
+            if func == 'nunique':
+                columns = columns + [col]
+        columns = list(dict.fromkeys(columns))
+
+        selection = self._select(filters, rows)
+        if selection is None:
+            return None
+        cells, residual = selection
+
+        part = {}
+        for col in columns:
+            part[col] = pd.Series(self.values[col][cells], dtype=object).astype(df[col].dtype)
+        for name in needed:
+            col, _, kind = name.rpartition(':')
+            if name == '_rows':
+                part[name] = self.rows[cells]
+            elif kind == 'sum':
+                part[name] = self.sums[col][cells]
+            elif col in self.measures:
+                part[name] = self.counts[col][cells]
+            else:
+                part[name] = self.rows[cells] * (self.values[col][cells] != None)  # noqa: E711
+        frame = pd.DataFrame(part, columns=columns + sorted(needed))
+        if len(residual) == 0:
+            return frame
+
+        extra = {col: df[col].take(residual).reset_index(drop=True) for col in columns}
+        for name in needed:
+            col, _, kind = name.rpartition(':')
+            if name == '_rows':
+                extra[name] = np.ones(len(residual), dtype=np.int64)
+            elif kind == 'sum':
+                extra[name] = df[col].take(residual).to_numpy(dtype=np.float64, na_value=0.0)
+            else:
+                extra[name] = df[col].take(residual).notna().to_numpy().astype(np.int64)
+        return pd.concat([frame, pd.DataFrame(extra, columns=frame.columns)], ignore_index=True)
+
+    def _finish(self, comps, named: dict):
+        """Turn summed parts (a frame or a row) into the requested aggregations."""
+        out = {}
+        for name, (col, func) in named.items():
+            if func == 'size':
+                out[name] = comps['_rows']
+            elif func == 'count':
+                out[name] = comps[f'{col}:count']
+            elif func == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    out[name] = comps[f'{col}:sum'] / comps[f'{col}:count']
+            else:
+                total = comps[f'{col}:sum']
+                out[name] = total.round().astype(np.int64) if self.kinds[col] in 'biu' else total
+        return out
+
+    def aggregate(self, df: pd.DataFrame, filters: dict, by, named: dict,
+                  rows: Callable[[], Optional[np.ndarray]]) -> Optional[pd.DataFrame]:
+        """``groupby(by, observed=True).agg(**named)`` over the filtered rows, or None."""
+        keys = [by] if isinstance(by, str) else list(by)
+        if any(k not in self.dims for k in keys) or any(f == 'nunique' for _, f in named.values()):
+            return None
+        frame = self._parts(df, filters, keys, named, rows)
+        if frame is None:
+            return None
+        comps = frame.groupby(by, observed=True).sum()
+        return pd.DataFrame(self._finish(comps, named), index=comps.index)
+
+    def totals(self, df: pd.DataFrame, filters: dict, named: dict,
+               rows: Callable[[], Optional[np.ndarray]]) -> Optional[dict]:
+        """Ungrouped aggregations over the filtered rows, or None."""
+        frame = self._parts(df, filters, [], named, rows)
+        if frame is None:
+            return None
+        sums = frame.drop(columns=[c for c in frame.columns if ':' not in c and c != '_rows']).sum()
+        numeric = {name: spec for name, spec in named.items() if spec[1] != 'nunique'}
+        out = {name: value.item() if isinstance(value, np.generic) else value
+               for name, value in self._finish(sums, numeric).items()}
+        for name, (col, func) in named.items():
+            if func == 'nunique':
+                out[name] = int(frame[col].nunique())
+        return out
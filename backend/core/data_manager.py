@@ -1,11 +1,83 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import date, datetime, time
 from typing import Optional, Any
+import base64
+import hashlib
 import io
-from backend.core.utils import find_column
+import json
+import os
+from backend.core import ingest, serialize, snapshot
+from backend.core.cache import ResultCache
+from backend.core.indexes import BULK_PATCH_ROWS, build_index, build_postings, get_index, move_posting
+from backend.core.utils import DATE_FILTER_COLUMNS, filter_columns, find_column
 from backend.metrics import kpis
 
+# Candidate names of the key linking Sales and Claims
+POLICY_COLUMNS = ['Policy No', 'PolicyNo', 'POLICY_NO', 'Policy Number']
+
+# Low-cardinality text dimensions stored as categoricals
+CATEGORY_COLUMNS = [
+    'Dealer', 'Dealer AJA', 'Product', 'Coverage', 'Make', 'Model', 'Country Name',
+    'Vehicle Type', 'Body Type', 'Claim Status', 'Part Type', 'Part Name',
+]
+# Columns that share another column's category dictionary across the two sheets
+SHARED_CATEGORIES = {'Dealer AJA': 'Dealer'}
+
+# Numeric storage plan: amounts at the configured float width (float32 halves
+# them at ~7 significant digits), small integer dimensions in the narrowest type
+FLOAT_DTYPE = os.environ.get('CLARITY_FLOAT_DTYPE', 'float64')
+if FLOAT_DTYPE not in ('float32', 'float64'):
+    print(f"Unsupported CLARITY_FLOAT_DTYPE {FLOAT_DTYPE!r}; using float64")
+    FLOAT_DTYPE = 'float64'
+AMOUNT_COLUMNS = ['Gross Premium', 'Risk Premium', 'Labor', 'Parts', 'Total Auth Amount']
+SMALL_INT_COLUMNS = {'Year': 'int16', 'Month': 'int8', 'Cylinder': 'int8', 'CC': 'int16'}
+
+def _distinct_sorted(series: pd.Series) -> list:
+    """Sorted distinct non-null values; categoricals read their dictionary."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+        return series.cat.categories[used].tolist()
+    return sorted(series.dropna().unique().tolist())
+
+def _shares_buffer(a: pd.Series, b: pd.Series) -> bool:
+    """Whether two columns are backed by the same memory (e.g. a shallow copy)."""
+    def buffer(s):
+        return s.array.codes if isinstance(s.dtype, pd.CategoricalDtype) else s.to_numpy()
+    return len(a) > 0 and np.may_share_memory(buffer(a), buffer(b))
+
+def _write_cells(df: pd.DataFrame, positions, column: str, values) -> None:
+    """Write ``values`` into rows of ``column`` through a fresh copy of the column.
+
+    Working tables share columns with the originals (and with read-only shared
+    mappings), so a column is never written in place; a Series taken from the
+    table before the write also keeps its values, for rolling back.
+    """
+    df[column] = df[column].copy()
+    df.loc[df.index[positions], column] = values
+
+def _cursor_scope(table: str, filters: dict, sort_by: Optional[str], ascending: bool) -> str:
+    """Fingerprint of the listing (table, filters, sort) a raw-data cursor walks."""
+    raw = json.dumps([table, sorted(filters.items()), sort_by, ascending], default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+def _encode_cursor(scope: str, value: Any, row_id: Any) -> str:
+    """Opaque cursor naming the last row served by its sort value and ``_row_id``."""
+    payload = json.dumps({'s': scope, 'v': value, 'id': row_id},
+                         default=lambda v: v.item() if isinstance(v, np.generic) else str(v))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor: str, scope: str) -> dict:
+    """``{'v': sort value, 'id': row id}`` of a cursor from ``_encode_cursor`` for this listing."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(payload, dict) or 'id' not in payload or payload.get('s') != scope:
+        raise ValueError("Cursor belongs to a different table, filter or sort")
+    return payload
+
 class DataManager:
     def __init__(self):
         self.original_sales_df: Optional[pd.DataFrame] = None
@@ -14,44 +86,263 @@ class DataManager:
         self.claims_df: Optional[pd.DataFrame] = None
         self.merged_df: Optional[pd.DataFrame] = None
         self.change_log: list[dict] = []
-        self._query_cache: dict[tuple, Any] = {}
+        self._query_cache = ResultCache()
         self._metrics_dirty = True
+        self.load_source: Optional[str] = None
+        # Bumped by every load and committed edit; responses report the version they read
+        self.version = 0
+        # Policy No -> sorted row positions in sales_df / claims_df, for patching merged_df;
+        # built by _links on the first edit
+        self._policy_links: Optional[dict[str, dict]] = None
+        self._links_built = False
+        self._batching = False
+        self._merged_stale = False
+        # table -> column -> _row_ids edited since the last load/reset
+        self._edited_cells: dict[str, dict[str, set]] = {}
+        # Mapped tables of the shared generation being served, if any
+        self._shared_tables: Optional[dict[str, pd.DataFrame]] = None
 
     # ─── Loading ────────────────────────────────────────────────
 
     def load_excel(self, file_path: str = None, file_bytes: bytes = None):
-        """Load Excel file from path or bytes."""
+        """Load Excel file from path or bytes.
+
+        Loads from a path reuse the columnar snapshot of a previous parse when the
+        file is unchanged; otherwise the workbook is parsed and the snapshot rebuilt.
+        """
         if file_path:
-            xls = pd.ExcelFile(file_path)
+            tables = snapshot.load_for_source(file_path, variant=FLOAT_DTYPE)
+            if tables is not None and {'sales', 'claims'} <= set(tables):
+                self.load_source = 'snapshot'
+                self._set_tables(tables['sales'], tables['claims'])
+                return
+            source = file_path
         elif file_bytes:
-            xls = pd.ExcelFile(io.BytesIO(file_bytes))
+            source = file_bytes
         else:
             raise ValueError("Provide file_path or file_bytes")
 
-        sheets = xls.sheet_names
+        sales_df, claims_df = self._read_workbook(source)
+        if file_path:
+            snapshot.save_for_source(file_path, {'sales': sales_df, 'claims': claims_df}, variant=FLOAT_DTYPE)
+        self.load_source = 'excel'
+        self._set_tables(sales_df, claims_df)
+
+    def load_tables(self, sales_source, claims_source, names: tuple[str, str] = ('', '')):
+        """Load Sales and Claims from separate CSV, Parquet or Arrow files.
+
+        Each source is a path, bytes or binary file object whose format is
+        detected from its magic bytes or extension (``names`` supply file names
+        for non-path sources). The frames get the same normalization as sheets.
+        """
+        sales_df = ingest.read_table(sales_source, names[0])
+        claims_df = ingest.read_table(claims_source, names[1])
+        self.load_source = ingest.detect_format(sales_source, names[0])
+        self._set_tables(*self._normalize_tables(sales_df, claims_df))
+
+    @classmethod
+    def from_upload(cls, fileobj, progress: Optional[ingest.IngestProgress] = None,
+                    claims_fileobj=None, names: tuple[str, str] = ('', '')) -> 'DataManager':
+        """A new manager loaded from an uploaded workbook, parsed in row chunks.
+
+        With ``claims_fileobj``, ``fileobj`` and it are instead the Sales and
+        Claims tables as CSV, Parquet or Arrow files. Nothing is shared with the
+        manager serving requests; install the result with ``adopt`` once it is complete.
+        """
+        manager = cls()
+        progress = progress or ingest.IngestProgress()
+        if claims_fileobj is not None:
+            progress.update(sheet='tables')
+            manager.load_tables(fileobj, claims_fileobj, names)
+            return manager
+        if ingest.detect_format(fileobj, names[0]) != 'excel':
+            raise ValueError("CSV, Parquet and Arrow uploads need both a sales file and a claims file")
+        sales_df, claims_df = ingest.read_workbook(fileobj, cls.pick_sheets, progress)
+        progress.update(state='indexing')
+        manager.load_source = 'upload'
+        manager._set_tables(*manager._normalize_tables(sales_df, claims_df))
+        return manager
+
+    def adopt(self, other: 'DataManager'):
+        """Take over another manager's tables, indexes, cache and change log in one step.
+
+        Call it holding the data lock exclusively, so no reader can observe a
+        half-swapped state. The version keeps counting from this manager's.
+        """
+        version = self.version
+        self.__dict__.update(other.__dict__)
+        self.version = version + 1
+
+    def shared_state(self) -> tuple[dict[str, pd.DataFrame], dict]:
+        """Tables and bookkeeping to publish as a shared generation (see ``shared``)."""
+        tables = {
+            'original_sales': self.original_sales_df, 'original_claims': self.original_claims_df,
+            'sales': self.sales_df, 'claims': self.claims_df, 'merged': self.merged_df,
+        }
+        meta = {
+            'version': self.version,
+            'loadSource': self.load_source,
+            'changeLog': self.change_log,
+            'editedCells': {table: {column: sorted(int(r) for r in row_ids) for column, row_ids in columns.items()}
+                            for table, columns in self._edited_cells.items()},
+        }
+        return tables, meta
+
+    def attach(self, tables: dict[str, pd.DataFrame], meta: dict, indexes: Optional[dict] = None):
+        """Serve a published shared generation, as ``shared_state`` describes it.
+
+        The generation's tables are read-only mappings, so the working tables
+        are shallow copies: an edit writes into a private copy of its column
+        (see ``_write_cells``). ``indexes`` holds the working tables' published index
+        arrays (see ``TableIndex``); whatever is missing is rebuilt.
+        """
+        indexes = indexes or {}
+        # Keep the mapped frames referenced while the working tables share their columns
+        self._shared_tables = tables
+        self.original_sales_df = tables['original_sales']
+        self.original_claims_df = tables['original_claims']
+        self.sales_df = tables['sales'].copy(deep=False)
+        self.claims_df = tables['claims'].copy(deep=False)
+        build_index(self.sales_df, indexes.get('sales'))
+        build_index(self.claims_df, indexes.get('claims'))
+        self._build_merged(tables['merged'].copy(deep=False), indexes.get('merged'))
+        self.change_log = list(meta.get('changeLog', []))
+        self._edited_cells = {table: {column: set(row_ids) for column, row_ids in columns.items()}
+                              for table, columns in meta.get('editedCells', {}).items()}
+        self.load_source = meta.get('loadSource')
+        self.version = meta.get('version', self.version + 1)
+        self.clear_cache()
+
+    @staticmethod
+    def pick_sheets(sheets: list[str]) -> tuple[str, str]:
+        """Names of the Sales and Claims sheets among a workbook's ``sheets``."""
         sales_sheet = next((s for s in sheets if 'sale' in s.lower()), sheets[0])
         claims_sheet = next((s for s in sheets if 'claim' in s.lower()), sheets[1] if len(sheets) > 1 else sheets[0])
+        return sales_sheet, claims_sheet
 
-        self.original_sales_df = pd.read_excel(xls, sales_sheet)
-        self.original_claims_df = pd.read_excel(xls, claims_sheet)
+    def _read_workbook(self, source) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Parse (in parallel) and normalize the Sales and Claims sheets of a path or bytes."""
+        with pd.ExcelFile(io.BytesIO(source) if isinstance(source, bytes) else source) as xls:
+            sheets = self.pick_sheets(xls.sheet_names)
+        sales_df, claims_df = ingest.parse_sheets(source, list(sheets))
+        return self._normalize_tables(sales_df, claims_df)
 
+    def _normalize_tables(self, sales_df: pd.DataFrame, claims_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Give freshly parsed sheets row IDs, typed dates, Year/Month and compact dtypes."""
         # Normalize column names
-        self.original_sales_df.columns = [c.strip() for c in self.original_sales_df.columns]
-        self.original_claims_df.columns = [c.strip() for c in self.original_claims_df.columns]
+        sales_df.columns = [c.strip() for c in sales_df.columns]
+        claims_df.columns = [c.strip() for c in claims_df.columns]
 
         # Add row IDs
-        self.original_sales_df.insert(0, '_row_id', range(len(self.original_sales_df)))
-        self.original_claims_df.insert(0, '_row_id', range(len(self.original_claims_df)))
+        sales_df.insert(0, '_row_id', range(len(sales_df)))
+        claims_df.insert(0, '_row_id', range(len(claims_df)))
+
+        # Parse dates once so requests never have to
+        self._parse_date_columns(sales_df)
+        self._parse_date_columns(claims_df)
 
         # Ensure Year/Month exist
-        self._ensure_date_columns(self.original_sales_df)
-        self._ensure_date_columns(self.original_claims_df)
+        self._ensure_date_columns(sales_df)
+        self._ensure_date_columns(claims_df)
+
+        self._compact_numeric(sales_df)
+        self._compact_numeric(claims_df)
+        self._encode_categories(sales_df, claims_df)
+        return sales_df, claims_df
+
+    def _set_tables(self, sales_df: pd.DataFrame, claims_df: pd.DataFrame):
+        """Install freshly loaded originals and rebuild working copies."""
+        self.original_sales_df = sales_df
+        self.original_claims_df = claims_df
 
         self.clear_cache()
-        self.sales_df = self.original_sales_df.copy()
-        self.claims_df = self.original_claims_df.copy()
+        self._reset_working_tables()
+        self.version += 1
+
+    def _reset_working_tables(self):
+        """Fresh working copies of the originals, with their indexes and merged view.
+
+        The copies are shallow: they share every column with the originals
+        until an edit writes to it, which copies only that column (``_write_cells``).
+        """
+        self.sales_df = self.original_sales_df.copy(deep=False)
+        self.claims_df = self.original_claims_df.copy(deep=False)
+        build_index(self.sales_df)
+        build_index(self.claims_df)
         self._build_merged()
         self.change_log = []
+        self._edited_cells = {}
+
+    def _parse_date_columns(self, df: pd.DataFrame):
+        """Store text date columns as datetime64 when every value parses."""
+        for col in df.columns:
+            if 'date' not in col.lower() or df[col].dtype != object:
+                continue
+            parsed = pd.to_datetime(df[col], errors='coerce')
+            if parsed.notna().sum() == df[col].notna().sum():
+                df[col] = parsed
+
+    def _compact_numeric(self, df: pd.DataFrame):
+        """Narrow amount and small integer columns per the storage plan."""
+        for col in AMOUNT_COLUMNS:
+            if col in df.columns and df[col].dtype.kind == 'f' and df[col].dtype != FLOAT_DTYPE:
+                df[col] = df[col].astype(FLOAT_DTYPE)
+        for col, dtype in SMALL_INT_COLUMNS.items():
+            if col not in df.columns or df[col].dtype.kind not in 'iu':
+                continue
+            info = np.iinfo(dtype)
+            if df[col].empty or (df[col].min() >= info.min and df[col].max() <= info.max):
+                df[col] = df[col].astype(dtype)
+
+    def _encode_categories(self, *dfs: pd.DataFrame):
+        """Store text dimensions as categoricals with sorted, per-dimension dictionaries.
+
+        A dimension appearing in both sheets (e.g. Make, or Dealer / Dealer AJA)
+        gets one dictionary, so its codes mean the same thing in either table.
+        Columns holding anything but strings, or mostly distinct values, stay as-is.
+        """
+        values: dict[str, set] = {}
+        targets = []
+        for df in dfs:
+            for col in CATEGORY_COLUMNS:
+                if col not in df.columns or df[col].dtype != object:
+                    continue
+                present = df[col].dropna()
+                distinct = set(present.unique())
+                if not all(isinstance(v, str) for v in distinct) or len(distinct) > max(1, len(present) // 2):
+                    continue
+                values.setdefault(SHARED_CATEGORIES.get(col, col), set()).update(distinct)
+                targets.append((df, col))
+        for df, col in targets:
+            categories = sorted(values[SHARED_CATEGORIES.get(col, col)])
+            df[col] = df[col].astype(pd.CategoricalDtype(categories))
+
+    def _ensure_dtype(self, df: pd.DataFrame, column: str, values) -> None:
+        """Make room in a compacted column for values about to be written.
+
+        New strings are merged into a categorical's sorted dictionary (anything
+        else turns it back into plain objects), and a narrowed integer column
+        is widened to int64 when a value doesn't fit it.
+        """
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            new = {v for v in values if not pd.isna(v) and v not in categories}
+            if not new:
+                return
+            if all(isinstance(v, str) for v in new) and categories.dtype == object:
+                df[column] = series.cat.set_categories(sorted(set(categories) | new))
+            else:
+                df[column] = series.astype(object)
+        elif series.dtype.kind in 'iu' and series.dtype.itemsize < 8:
+            info = np.iinfo(series.dtype)
+            fits = all(
+                isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+                and not pd.isna(v) and float(v).is_integer() and info.min <= v <= info.max
+                for v in values
+            )
+            if not fits:
+                df[column] = series.astype(np.int64)
 
     def _ensure_date_columns(self, df: pd.DataFrame):
         """Derive Year and Month from date columns if missing."""
@@ -75,37 +366,92 @@ class DataManager:
             except Exception as e:
                 print(f"Error deriving Year/Month from {date_col}: {e}")
 
-    def _build_merged(self):
-        """Link Sales and Claims by Policy No."""
+    def _build_merged(self, merged: Optional[pd.DataFrame] = None, index_arrays: Optional[dict] = None):
+        """Link Sales and Claims by Policy No (reusing an already merged ``merged`` and its index)."""
         if self.sales_df is None or self.claims_df is None:
             return
 
-        sales_policy_col = find_column(self.sales_df, ['Policy No', 'PolicyNo', 'POLICY_NO', 'Policy Number'])
-        claims_policy_col = find_column(self.claims_df, ['Policy No', 'PolicyNo', 'POLICY_NO', 'Policy Number'])
+        self.merged_df = merged if merged is not None else self._merge_tables()
+        self._policy_links = None
+        self._links_built = False
+        build_index(self.merged_df, index_arrays)
+
+    def _links(self) -> Optional[dict[str, dict]]:
+        """The policy links, built on first use; None when the tables can't be linked row for row.
+
+        Only edits need them, and with one small array per policy they cost
+        more memory than the columns they index, so read-only processes never
+        build them. Built mid-edit they already reflect it, and relinking the
+        edited rows is then a no-op.
+        """
+        if not self._links_built:
+            sales_policy_col = find_column(self.sales_df, POLICY_COLUMNS)
+            claims_policy_col = find_column(self.claims_df, POLICY_COLUMNS)
+            # Incremental upkeep needs one shared key column and one merged row per sales row
+            if (sales_policy_col and sales_policy_col == claims_policy_col
+                    and len(self.merged_df) == len(self.sales_df)):
+                self._policy_links = {
+                    'sales': build_postings(self.sales_df[sales_policy_col]),
+                    'claims': build_postings(self.claims_df[claims_policy_col]),
+                }
+            self._links_built = True
+        return self._policy_links
+
+    def _merge_tables(self) -> pd.DataFrame:
+        """Sales rows with per-policy claim_count, total_claim_amount and has_claim."""
+        sales_policy_col = find_column(self.sales_df, POLICY_COLUMNS)
+        claims_policy_col = find_column(self.claims_df, POLICY_COLUMNS)
 
         if sales_policy_col and claims_policy_col:
-            claims_agg = self.claims_df.groupby(claims_policy_col).agg(
+            claims_agg = self.claims_df.groupby(claims_policy_col, observed=True).agg(
                 claim_count=(claims_policy_col, 'size'),
                 total_claim_amount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in self.claims_df.columns else (claims_policy_col, 'size'),
             ).reset_index()
 
-            self.merged_df = self.sales_df.merge(
+            merged_df = self.sales_df.merge(
                 claims_agg,
                 left_on=sales_policy_col,
                 right_on=claims_policy_col,
                 how='left'
             )
-            self.merged_df['has_claim'] = self.merged_df['claim_count'].fillna(0) > 0
-            self.merged_df['claim_count'] = self.merged_df['claim_count'].fillna(0).astype(int)
-            self.merged_df['total_claim_amount'] = self.merged_df['total_claim_amount'].fillna(0)
+            merged_df['has_claim'] = merged_df['claim_count'].fillna(0) > 0
+            merged_df['claim_count'] = merged_df['claim_count'].fillna(0).astype(int)
+            merged_df['total_claim_amount'] = merged_df['total_claim_amount'].fillna(0)
         else:
-            self.merged_df = self.sales_df.copy()
-            self.merged_df['has_claim'] = False
-            self.merged_df['claim_count'] = 0
-            self.merged_df['total_claim_amount'] = 0
+            merged_df = self.sales_df.copy()
+            merged_df['has_claim'] = False
+            merged_df['claim_count'] = 0
+            merged_df['total_claim_amount'] = 0
+        return merged_df
+
+    def check_merged(self) -> list[str]:
+        """Compare merged_df against a full rebuild; returns one message per mismatch."""
+        if self.sales_df is None or self.claims_df is None:
+            return []
+        expected, actual = self._merge_tables(), self.merged_df
+        if list(actual.columns) != list(expected.columns):
+            return [f"columns differ: {list(actual.columns)} != {list(expected.columns)}"]
+        if len(actual) != len(expected):
+            return [f"row count differs: {len(actual)} != {len(expected)}"]
+
+        problems = []
+        for col in expected.columns:
+            a, b = actual[col], expected[col]
+            if a.dtype != b.dtype:
+                problems.append(f"{col}: dtype {a.dtype} != {b.dtype}")
+                continue
+            if pd.api.types.is_float_dtype(b):
+                # Per-policy sums may round differently from the grouped sum
+                same = np.isclose(a.to_numpy(), b.to_numpy(), rtol=1e-9, equal_nan=True)
+            else:
+                same = (a.to_numpy() == b.to_numpy()) | (a.isna().to_numpy() & b.isna().to_numpy())
+            if not same.all():
+                rows = np.flatnonzero(~same)
+                problems.append(f"{col}: {len(rows)} rows differ, first at position {rows[0]}")
+        return problems
 
     def clear_cache(self):
-        self._query_cache = {}
+        self._query_cache.clear()
         self._metrics_dirty = True
 
     def get_cache_key(self, method_name: str, filters: Optional[dict]) -> tuple:
@@ -115,14 +461,74 @@ class DataManager:
         return (method_name, filter_tuple)
 
     def cache_result(self, key, value):
-        self._query_cache[key] = value
-        return value
+        return self._query_cache.put(key, value)
 
     def get_cached(self, key):
         return self._query_cache.get(key)
 
+    def cached(self, method_name: str, filters: Optional[dict], compute, reads: Optional[dict] = None):
+        """Return the cached result of ``compute()`` for this method and filter set.
+
+        ``reads`` maps 'sales' / 'claims' / 'merged' to the columns the metric
+        reads ('*' for all of them). The columns the filters read are added, and
+        edits only invalidate the entries depending on the touched column; an
+        entry without ``reads`` is dropped on any change.
+        """
+        deps = self._dependencies(reads, filters or {}) if reads is not None else None
+        return self._query_cache.get_or_compute(self.get_cache_key(method_name, filters), compute, deps)
+
+    def _dependencies(self, reads: dict, filters: dict) -> dict:
+        deps = {}
+        for table, columns in reads.items():
+            df = self._table(table)
+            filtered = filter_columns(df, filters) if df is not None else set()
+            if columns == '*' or filtered is None:
+                deps[table] = None
+            else:
+                deps[table] = frozenset(columns) | filtered
+        return deps
+
+    def cache_stats(self) -> dict:
+        return self._query_cache.stats()
+
     # ─── Filter Options ────────────────────────────────────────
 
+    def memory_usage(self) -> dict:
+        """Resident footprint of every loaded table, per column, in bytes.
+
+        Working-table columns still shared with the originals (i.e. never
+        edited) are flagged and counted once in ``totalBytes``.
+        """
+        frames = {
+            'originalSales': self.original_sales_df, 'originalClaims': self.original_claims_df,
+            'sales': self.sales_df, 'claims': self.claims_df, 'merged': self.merged_df,
+        }
+        shared_with = {'sales': self.original_sales_df, 'claims': self.original_claims_df}
+        tables = {}
+        for name, df in frames.items():
+            if df is None:
+                continue
+            usage = df.memory_usage(deep=True, index=False)
+            original = shared_with.get(name)
+            columns = {}
+            for col in df.columns:
+                shared = (original is not None and col in original.columns
+                          and _shares_buffer(df[col], original[col]))
+                columns[col] = {'dtype': str(df[col].dtype), 'bytes': int(usage[col]), 'shared': shared}
+            tables[name] = {
+                'rows': len(df),
+                'bytes': int(usage.sum()),
+                'sharedBytes': sum(c['bytes'] for c in columns.values() if c['shared']),
+                'columns': columns,
+            }
+        own = sum(t['bytes'] - t['sharedBytes'] for t in tables.values())
+        return {
+            'floatDtype': FLOAT_DTYPE,
+            'tables': tables,
+            'cacheBytes': self._query_cache.bytes,
+            'totalBytes': own + self._query_cache.bytes,
+        }
+
     def get_filter_options(self) -> dict:
         """Return available filter values from data."""
         if self.sales_df is None:
@@ -135,33 +541,45 @@ class DataManager:
             ('Coverage', 'coverages'), ('Vehicle Type', 'vehicleTypes'), ('Body Type', 'bodyTypes')
         ]:
             if col in self.sales_df.columns:
-                options[key] = sorted(self.sales_df[col].dropna().unique().tolist())
+                options[key] = _distinct_sorted(self.sales_df[col])
 
         if self.claims_df is not None:
             if 'Claim Status' in self.claims_df.columns:
-                options['claimStatuses'] = sorted(self.claims_df['Claim Status'].dropna().unique().tolist())
+                options['claimStatuses'] = _distinct_sorted(self.claims_df['Claim Status'])
             if 'Part Type' in self.claims_df.columns:
-                options['partTypes'] = sorted(self.claims_df['Part Type'].dropna().unique().tolist())
+                options['partTypes'] = _distinct_sorted(self.claims_df['Part Type'])
 
-        date_col = find_column(self.sales_df, ['Policy Sold Date', 'Failure Date'])
-        if date_col and date_col in self.sales_df.columns:
-            try:
-                dates = pd.to_datetime(self.sales_df[date_col], errors='coerce').dropna()
-                if not dates.empty:
-                    options['minDate'] = dates.min().strftime('%Y-%m-%d')
-                    options['maxDate'] = dates.max().strftime('%Y-%m-%d')
-            except Exception:
-                pass
+        date_range = self.get_date_range()
+        if date_range:
+            options['minDate'] = date_range[0].strftime('%Y-%m-%d')
+            options['maxDate'] = date_range[1].strftime('%Y-%m-%d')
 
         return options
 
+    def get_date_range(self) -> Optional[tuple[pd.Timestamp, pd.Timestamp]]:
+        """Earliest and latest sales date, read from the date index when available."""
+        if self.sales_df is None:
+            return None
+        index = get_index(self.sales_df)
+        if index is not None and index.dates is not None:
+            return (index.dates.min, index.dates.max) if index.dates.min is not None else None
+
+        date_col = find_column(self.sales_df, DATE_FILTER_COLUMNS)
+        if not date_col:
+            return None
+        try:
+            dates = pd.to_datetime(self.sales_df[date_col], errors='coerce').dropna()
+        except Exception:
+            return None
+        return (dates.min(), dates.max()) if not dates.empty else None
+
     # ─── Data Summary for AI ───────────────────────────────────
 
     def get_data_summary_for_ai(self, filters: dict = None) -> str:
         """Generate a rich text summary for Gemini — includes full breakdowns so it can answer
         questions like 'which month has most sales', 'top dealer', 'best product', etc."""
         from backend.metrics import sales, claims
-        from backend.core.utils import apply_filters
+        from backend.core.utils import filter_view
 
         summary = kpis.get_summary(self.sales_df, self.claims_df, self.merged_df, filters)
         if not summary:
@@ -299,9 +717,9 @@ class DataManager:
         try:
             cdf = self.claims_df
             if cdf is not None and filters:
-                cdf = apply_filters(cdf, filters)
+                cdf = filter_view(cdf, filters)
             if cdf is not None and 'Part Name' in cdf.columns:
-                part_counts = cdf.groupby('Part Name').agg(
+                part_counts = cdf.groupby('Part Name', observed=True).agg(
                     count=('Part Name', 'size'),
                     total_amount=('Total Auth Amount', 'sum')
                 ).sort_values('count', ascending=False).head(20).reset_index()
@@ -321,9 +739,9 @@ class DataManager:
         try:
             cdf = self.claims_df
             if cdf is not None and filters:
-                cdf = apply_filters(cdf, filters)
+                cdf = filter_view(cdf, filters)
             if cdf is not None and 'Part Type' in cdf.columns:
-                ptype_counts = cdf.groupby('Part Type').agg(
+                ptype_counts = cdf.groupby('Part Type', observed=True).agg(
                     count=('Part Type', 'size'),
                     total_amount=('Total Auth Amount', 'sum')
                 ).sort_values('count', ascending=False).reset_index()
@@ -342,9 +760,9 @@ class DataManager:
         try:
             cdf = self.claims_df
             if cdf is not None and filters:
-                cdf = apply_filters(cdf, filters)
+                cdf = filter_view(cdf, filters)
             if cdf is not None and 'Make' in cdf.columns:
-                make_claims = cdf.groupby('Make').agg(
+                make_claims = cdf.groupby('Make', observed=True).agg(
                     count=('Make', 'size'),
                     total_amount=('Total Auth Amount', 'sum')
                 ).sort_values('count', ascending=False).head(15).reset_index()
@@ -376,8 +794,8 @@ class DataManager:
     def get_raw_data(self, table: str, page: int = 1, limit: int = 100,
                      filters: dict = None, sort_by: str = None, sort_dir: str = 'asc') -> dict:
         """Get paginated raw data for Data Manager."""
-        from backend.core.utils import apply_filters
-        
+        from backend.core.utils import FilteredView, filter_view, sort_positions
+
         if table == 'sales':
             df = self.sales_df
         elif table == 'claims':
@@ -389,33 +807,28 @@ class DataManager:
             return {'rows': [], 'total': 0, 'page': 1, 'pages': 0}
 
         filters = filters or {}
-        df = apply_filters(df, filters)
+        view = filter_view(df, filters)
 
-        # Sort
-        if sort_by and sort_by in df.columns:
-            df = df.sort_values(sort_by, ascending=(sort_dir == 'asc'))
-
-        total = len(df)
+        total = len(view)
         pages = max(1, (total + limit - 1) // limit)
         page = max(1, min(page, pages))
         start = (page - 1) * limit
         end = start + limit
 
-        result = df.iloc[start:end].copy()
-
-        # Convert dates safely
-        for col in result.columns:
-            if result[col].dtype == 'datetime64[ns]':
-                result[col] = result[col].dt.strftime('%Y-%m-%d')
-
-        # Replace NaN/inf with None for JSON serialization
-        result = result.where(pd.notnull(result), None)
-        result = result.replace([np.inf, -np.inf], None)
+        # Sort: indexed tables keep the order between pages and only sort as far as asked
+        if sort_by and sort_by in view.columns:
+            ascending = sort_dir == 'asc'
+            index = get_index(df)
+            if index is not None:
+                view = FilteredView(df, index.sorted_rows(filters, sort_by, ascending, end))
+            else:
+                view = FilteredView(df, view._base()[sort_positions(view[sort_by], ascending, end)])
 
+        result = view.slice(start, end).frame()
         columns = [c for c in result.columns if c != '_row_id']
 
         return {
-            'rows': result.to_dict('records'),
+            'rows': self._records(result),
             'columns': columns,
             'total': total,
             'page': page,
@@ -423,6 +836,100 @@ class DataManager:
             'limit': limit,
         }
 
+    def scroll_raw_data(self, table: str, cursor: str = None, limit: int = 100,
+                        filters: dict = None, sort_by: str = None, sort_dir: str = 'asc') -> dict:
+        """Keyset-paginated raw data: the ``limit`` rows after ``cursor``.
+
+        Rows are ordered by ``sort_by`` (missing last), then by row. The
+        cursor (the previous page's ``nextCursor``) carries the last row's sort
+        value and ``_row_id``, so a page is found by binary search in the
+        memoized sort order instead of by offset, and nothing is counted (see
+        ``count_raw_data``). Raises ValueError for a cursor from another listing.
+        """
+        from backend.core.utils import filter_rows, seek_sorted, sort_positions
+
+        df = self.sales_df if table == 'sales' else self.claims_df if table == 'claims' else None
+        if df is None:
+            return {'rows': [], 'columns': [], 'nextCursor': None, 'limit': limit}
+
+        filters = filters or {}
+        sort_by = sort_by if sort_by in df.columns else None
+        ascending = sort_dir == 'asc'
+        scope = _cursor_scope(table, filters, sort_by, ascending or sort_by is None)
+        after, position = None, None
+        if cursor:
+            after = _decode_cursor(cursor, scope)
+            position = self._row_position(table, after['id'])
+            if position is None:
+                raise ValueError(f"Cursor row {after['id']} no longer exists")
+
+        index = get_index(df)
+
+        def ordered(stop: int) -> np.ndarray:
+            if index is not None:
+                return index.sorted_rows(filters, sort_by, ascending, stop)
+            rows = filter_rows(df, filters)
+            values = df[sort_by] if rows is None else df[sort_by].take(rows)
+            order = sort_positions(values, ascending)
+            return order if rows is None else rows[order]
+
+        def seek(order: np.ndarray) -> int:
+            return 0 if after is None else seek_sorted(df[sort_by], order, ascending, after.get('v'), position)
+
+        if sort_by is None:
+            rows = filter_rows(df, filters)
+            order = np.arange(len(df)) if rows is None else rows
+            start = 0 if after is None else int(np.searchsorted(order, position, side='right'))
+        else:
+            # A memoized partial order may end before this page: then sort it all
+            order = ordered(limit + 1)
+            start = seek(order)
+            if index is not None and start + limit >= len(order):
+                longer = ordered(start + limit + 1)
+                if len(longer) != len(order):
+                    order, start = longer, seek(longer)
+
+        page = order[start:start + limit]
+        next_cursor = None
+        if start + limit < len(order) and len(page):
+            last = int(page[-1])
+            value = self._serialize(df[sort_by].iat[last]) if sort_by else None
+            next_cursor = _encode_cursor(scope, value, self._serialize(df['_row_id'].iat[last]))
+        result = df.take(page)
+        return {
+            'rows': self._records(result),
+            'columns': [c for c in result.columns if c != '_row_id'],
+            'nextCursor': next_cursor,
+            'limit': limit,
+        }
+
+    def count_raw_data(self, table: str, filters: dict = None) -> dict:
+        """Rows of ``table`` matching ``filters``, cached per filter set until a filtered column changes."""
+        from backend.core.utils import filter_rows
+
+        df = self.sales_df if table == 'sales' else self.claims_df if table == 'claims' else None
+        if df is None:
+            return {'total': 0}
+
+        def compute():
+            rows = filter_rows(df, filters or {})
+            return {'total': len(df) if rows is None else len(rows)}
+
+        return self.cached(f'raw_count_{table}', filters, compute, reads={table: []})
+
+    def get_row(self, table: str, row_id: Any) -> Optional[dict]:
+        """One row of a working table by ``_row_id``, serialized like get_raw_data rows."""
+        if table not in ('sales', 'claims'):
+            return None
+        position = self._row_position(table, row_id)
+        if position is None:
+            return None
+        return self._records(self._table(table).iloc[[position]])[0]
+
+    def _records(self, result: pd.DataFrame) -> list[dict]:
+        """Rows as JSON-safe dicts: dates as strings, NaN/inf as None."""
+        return serialize.records(result)
+
     # ─── Inline Editing ────────────────────────────────────────
 
     def update_cell(self, table: str, row_id: int, column: str, new_value: Any) -> dict:
@@ -431,31 +938,274 @@ class DataManager:
         if column not in df.columns: return {'success': False, 'error': f'Column {column} not found'}
         if column == '_row_id': return {'success': False, 'error': 'Cannot edit row ID'}
 
-        mask = df['_row_id'] == row_id
-        if not mask.any(): return {'success': False, 'error': f'Row {row_id} not found'}
+        position = self._row_position(table, row_id, rebuild=True)
+        if position is None: return {'success': False, 'error': f'Row {row_id} not found'}
 
-        old_value = df.loc[mask, column].values[0]
+        old_value = df[column].iat[position]
         validated_value, error = self._validate_value(table, column, new_value)
         if error: return {'success': False, 'error': error}
 
-        df.loc[mask, column] = validated_value
-        self.clear_cache()
+        self._ensure_dtype(df, column, [validated_value])
+        _write_cells(df, [position], column, validated_value)
+        self._log_change(table, row_id, column, old_value, validated_value)
+        self._propagate_edits(table, column, np.array([position]), [old_value], [df[column].iat[position]])
+        self.version += 1
+        return {'success': True, 'old_value': self._serialize(old_value), 'new_value': self._serialize(validated_value)}
+
+    def _row_position(self, table: str, row_id: Any, rebuild: bool = False) -> Optional[int]:
+        """Position of ``row_id`` in the working table, or None if there is no such row.
+
+        Uses the table's index; a frame without one falls back to scanning
+        ``_row_id``. An index left stale by rows reordered in place is rebuilt,
+        with merged_df, only when ``rebuild`` is set: edits pass it under the
+        write lock, while reads must not swap structures other readers use and
+        get None instead.
+        """
+        df = self._table(table)
+        if df is None:
+            return None
+        index = get_index(df)
+        if index is not None:
+            position = index.position_of(row_id)
+            if position is None or df['_row_id'].iat[position] == row_id:
+                return position
+            if not rebuild:
+                return None
+            # Postings and policy links are positional too, so refresh them all
+            position = build_index(df).position_of(row_id)
+            self._rebuild_merged()
+            return position
+        matches = np.flatnonzero((df['_row_id'] == row_id).to_numpy())
+        return int(matches[0]) if len(matches) else None
+
+    def _table(self, table: str) -> Optional[pd.DataFrame]:
+        return {'sales': self.sales_df, 'claims': self.claims_df, 'merged': self.merged_df}.get(table)
+
+    def _log_change(self, table: str, row_id: Any, column: str, old_value: Any, new_value: Any):
+        self._edited_cells.setdefault(table, {}).setdefault(column, set()).add(row_id)
         self.change_log.append({
             'timestamp': datetime.now().isoformat(),
             'table': table, 'row_id': row_id, 'column': column,
-            'old_value': self._serialize(old_value), 'new_value': self._serialize(validated_value),
+            'old_value': self._serialize(old_value), 'new_value': self._serialize(new_value),
         })
+
+    def _propagate_edits(self, table: str, column: str, positions: np.ndarray,
+                         old_values: list, new_values: list):
+        """Bring indexes, cached results and merged_df up to date after edits to one column.
+
+        A sales edit is mirrored into the matching merged rows. Changing a policy
+        key or a claim amount re-aggregates only the policies involved; merged_df
+        is rebuilt from scratch only when the tables can't be linked row for row.
+        """
+        df = self.sales_df if table == 'sales' else self.claims_df
+        index = get_index(df)
+        if index is not None:
+            index.update_many(positions, column, old_values, new_values)
+        self._query_cache.invalidate(table, column)
+        if self.merged_df is None or self._merged_stale:
+            return
+        links = self._links()
+        policy_col = find_column(df, POLICY_COLUMNS)
+
+        if table == 'claims':
+            if column not in (policy_col, 'Total Auth Amount'):
+                return
+            if links is None:
+                self._rebuild_merged()
+            elif column == policy_col:
+                self._relink(links, 'claims', df[policy_col], positions, old_values, new_values)
+                self._refresh_claim_totals(list(old_values) + list(new_values))
+            else:
+                self._refresh_claim_totals(df[policy_col].take(positions).tolist())
+            return
+
+        if column not in self.merged_df.columns or (column == policy_col and links is None):
+            self._rebuild_merged()
+            return
+        if not self._set_merged(positions, column, df[column].take(positions).to_numpy(copy=True)):
+            return
+        self._query_cache.invalidate('merged', column)
+        if column == policy_col:
+            self._relink(links, 'sales', df[policy_col], positions, old_values, new_values)
+            unlinked = positions[pd.isna(np.asarray(new_values, dtype=object))]
+            self._refresh_claim_totals(new_values, unlinked)
+
+    def _relink(self, links: dict, table: str, keys: pd.Series, positions: np.ndarray,
+                old_values: list, new_values: list):
+        """Move edited rows between policies in ``links[table]``."""
+        if len(positions) > BULK_PATCH_ROWS:
+            links[table] = build_postings(keys)
+            return
+        for position, old, new in zip(positions, old_values, new_values):
+            move_posting(links[table], int(position), old, new)
+
+    def _refresh_claim_totals(self, policies: list, unlinked: Optional[np.ndarray] = None):
+        """Re-aggregate claims for ``policies`` into their merged rows.
+
+        ``unlinked`` are merged rows whose policy key was cleared; they get no claims.
+        """
+        policies = list(dict.fromkeys(p for p in policies if not pd.isna(p)))
+        if len(policies) > BULK_PATCH_ROWS:
+            self._rebuild_merged()
+            return
+        links = self._links()
+        amounts = self.claims_df['Total Auth Amount'].to_numpy() if 'Total Auth Amount' in self.claims_df.columns else None
+        rows, counts, totals = [], [], []
+        if unlinked is not None and len(unlinked):
+            rows.append(unlinked)
+            counts.append(np.zeros(len(unlinked), dtype=np.int64))
+            totals.append(np.zeros(len(unlinked)))
+        for policy in policies:
+            sales_rows = links['sales'].get(policy)
+            if sales_rows is None:
+                continue
+            claim_rows = links['claims'].get(policy, np.empty(0, dtype=np.int64))
+            if amounts is None:
+                total = len(claim_rows)
+            elif amounts.dtype.kind == 'f':
+                # Skip NaN like the grouped sum does
+                total = np.nansum(amounts[claim_rows])
+            else:
+                total = amounts[claim_rows].sum()
+            rows.append(sales_rows)
+            counts.append(np.full(len(sales_rows), len(claim_rows)))
+            totals.append(np.full(len(sales_rows), total))
+        if not rows:
+            return
+        rows, counts = np.concatenate(rows), np.concatenate(counts)
+        for column, values in (('claim_count', counts), ('total_claim_amount', np.concatenate(totals)),
+                               ('has_claim', counts > 0)):
+            if not self._set_merged(rows, column, values):
+                return
+            self._query_cache.invalidate('merged', column)
+
+    def _set_merged(self, rows: np.ndarray, column: str, values) -> bool:
+        """Write into merged_df rows; rebuilds instead if the column's dtype would change."""
+        merged = self.merged_df
+        self._ensure_dtype(merged, column, np.atleast_1d(values))
+        dtype = merged[column].dtype
+        old_values = merged[column].take(rows).tolist()
+        _write_cells(merged, rows, column, values)
+        if merged[column].dtype != dtype:
+            self._rebuild_merged()
+            return False
+        index = get_index(merged)
+        if index is not None:
+            index.update_many(rows, column, old_values, merged[column].take(rows).tolist())
+        return True
+
+    def _rebuild_merged(self):
+        if self._batching:
+            # Rebuilt once when the batch commits
+            self._merged_stale = True
+            return
         self._build_merged()
-        return {'success': True, 'old_value': self._serialize(old_value), 'new_value': self._serialize(validated_value)}
+        self._query_cache.invalidate('merged')
 
     def bulk_update(self, table: str, updates: list[dict]) -> dict:
-        results = []
+        """Apply many cell edits as one transaction.
+
+        Every update is validated before anything is written; if any fails,
+        nothing is applied. Otherwise writes are grouped by column and applied
+        positionally, then indexes, merged_df and cached results are updated
+        once per column.
+        """
+        results, planned = self._plan_updates(table, updates)
+        if not all(r['success'] for r in results):
+            for r in results:
+                if r['success']:
+                    r.update(success=False, error='Not applied: other updates in the batch failed')
+            return {'results': results, 'success': False}
+        if not planned:
+            return {'results': results, 'success': True}
+
+        df = self.sales_df if table == 'sales' else self.claims_df
+        by_column: dict[str, dict[int, Any]] = {}
+        for _, column, position, _, value in planned:
+            # Later updates to the same cell win, as if applied in order
+            by_column.setdefault(column, {})[position] = value
+
+        written = {}
+        try:
+            for column, cells in by_column.items():
+                positions = np.fromiter(cells, dtype=np.int64, count=len(cells))
+                written[column] = (positions, df[column], df[column].take(positions).tolist())
+                self._ensure_dtype(df, column, cells.values())
+                values = pd.Series(list(cells.values()), index=df.index[positions])
+                if df[column].dtype.kind in 'iu' and values.dtype.kind in 'iu':
+                    # Already checked to fit; pandas would upcast a narrowed column on int64 input
+                    values = values.astype(df[column].dtype)
+                _write_cells(df, positions, column, values)
+        except Exception as e:
+            for column, (_, before, _) in written.items():
+                df[column] = before
+            return {'results': [{'success': False, 'error': f'Not applied: {e}'} for _ in results],
+                    'success': False}
+
+        for row_id, column, _, old_value, value in planned:
+            self._log_change(table, row_id, column, old_value, value)
+        self._batching = True
+        try:
+            for column, (positions, _, old_values) in written.items():
+                self._propagate_edits(table, column, positions, old_values, df[column].take(positions).tolist())
+        finally:
+            self._batching = False
+        if self._merged_stale:
+            self._merged_stale = False
+            self._rebuild_merged()
+        self.version += 1
+        return {'results': results, 'success': True}
+
+    def _plan_updates(self, table: str, updates: list[dict]) -> tuple[list[dict], list[tuple]]:
+        """Validate a batch of updates without writing anything.
+
+        Returns per-update results and ``(row_id, column, position, old, new)``
+        for each valid one; ``old`` accounts for earlier updates to the same cell.
+        """
+        df = self.sales_df if table == 'sales' else self.claims_df
+        results, planned, pending, columns = [], [], {}, {}
         for u in updates:
-            r = self.update_cell(table, u['row_id'], u['column'], u['new_value'])
-            results.append(r)
-        return {'results': results, 'success': all(r['success'] for r in results)}
+            if df is None:
+                results.append({'success': False, 'error': 'No data loaded'})
+                continue
+            if not isinstance(u, dict) or not {'row_id', 'column', 'new_value'} <= set(u):
+                results.append({'success': False, 'error': 'Each update needs row_id, column and new_value'})
+                continue
+            row_id, column = u['row_id'], u['column']
+            if column not in df.columns:
+                results.append({'success': False, 'error': f'Column {column} not found'})
+                continue
+            if column == '_row_id':
+                results.append({'success': False, 'error': 'Cannot edit row ID'})
+                continue
+            position = self._row_position(table, row_id, rebuild=True)
+            if position is None:
+                results.append({'success': False, 'error': f'Row {row_id} not found'})
+                continue
+            if column not in columns:
+                columns[column] = df[column]
+            series = columns[column]
+            value, error = self._validate_value(table, column, u['new_value'], series.dtype)
+            if error:
+                results.append({'success': False, 'error': error})
+                continue
+            key = (column, position)
+            old_value = self._as_stored(series, pending[key]) if key in pending else series.iat[position]
+            pending[key] = value
+            planned.append((row_id, column, position, old_value, value))
+            results.append({'success': True, 'old_value': self._serialize(old_value),
+                            'new_value': self._serialize(value)})
+        return results, planned
+
+    def _as_stored(self, series: pd.Series, value: Any) -> Any:
+        """``value`` as ``series`` would hold it after a write, when that's lossless."""
+        try:
+            stored = pd.Series([value]).astype(series.dtype).to_numpy()[0]
+            return stored if stored == value else value
+        except (TypeError, ValueError):
+            return value
 
-    def _validate_value(self, table: str, column: str, value: Any) -> tuple[Any, Optional[str]]:
+    def _validate_value(self, table: str, column: str, value: Any, dtype=None) -> tuple[Any, Optional[str]]:
         numeric_cols = {
             'sales': ['Gross Premium', 'Risk Premium', 'CC', 'Year', 'Month'],
             'claims': ['Labor', 'Parts', 'Total Auth Amount', 'Year', 'Month'],
@@ -466,24 +1216,70 @@ class DataManager:
                 return val, None
             except (ValueError, TypeError):
                 return None, f'{column} must be numeric'
+        if dtype is None:
+            df = self.sales_df if table == 'sales' else self.claims_df
+            dtype = df[column].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            # Keep date columns datetime64 so the date index stays usable
+            if value is None or value == '':
+                return pd.NaT, None
+            parsed = pd.to_datetime(value, errors='coerce')
+            if pd.isna(parsed):
+                return None, f'{column} must be a date'
+            return parsed, None
         return value, None
 
     def _serialize(self, val):
         if pd.isna(val): return None
-        if isinstance(val, (np.integer,)): return int(val)
-        if isinstance(val, (np.floating,)): return float(val)
-        if isinstance(val, pd.Timestamp): return val.isoformat()
+        if isinstance(val, np.datetime64): val = pd.Timestamp(val)
+        elif isinstance(val, np.generic): val = val.item()
+        if isinstance(val, (datetime, date, time)): return val.isoformat()
         return val
 
     def reset_data(self) -> dict:
         if self.original_sales_df is None: return {'success': False, 'error': 'No data loaded'}
-        self.sales_df = self.original_sales_df.copy()
-        self.claims_df = self.original_claims_df.copy()
-        self._build_merged()
-        self.clear_cache()
-        self.change_log = []
+        if not self._edited_cells:
+            # Nothing to undo: keep the version, so no client refetches and no generation is published
+            return {'success': True}
+        if not self._revert_edits():
+            self._reset_working_tables()
+            self.clear_cache()
+        self.version += 1
         return {'success': True}
 
+    def _revert_edits(self) -> bool:
+        """Undo every edit by re-sharing the edited columns of the originals.
+
+        Work is proportional to the edited cells: indexes, merged_df and cached
+        results are patched as for any other edit. Returns False, changing
+        nothing, when an edit changed a column's dtype and a full reset is needed.
+        """
+        originals = {'sales': self.original_sales_df, 'claims': self.original_claims_df}
+        plan = []
+        for table, columns in self._edited_cells.items():
+            df, original = self._table(table), originals[table]
+            for column, row_ids in columns.items():
+                if df[column].dtype != original[column].dtype:
+                    return False
+                positions = {self._row_position(table, row_id, rebuild=True) for row_id in row_ids} - {None}
+                plan.append((table, column, np.array(sorted(positions), dtype=np.int64)))
+
+        self._batching = True
+        try:
+            for table, column, positions in plan:
+                df = self._table(table)
+                old_values = df[column].take(positions).tolist()
+                df[column] = originals[table][column]
+                self._propagate_edits(table, column, positions, old_values, df[column].take(positions).tolist())
+        finally:
+            self._batching = False
+        if self._merged_stale:
+            self._merged_stale = False
+            self._rebuild_merged()
+        self.change_log = []
+        self._edited_cells = {}
+        return True
+
     def export_data(self, table: str) -> bytes:
         df = self.sales_df if table == 'sales' else self.claims_df
         if df is None: return b''
@@ -0,0 +1,429 @@
+"""
+Per-table posting indexes for the dimension filters.
+
+Each ``TableIndex`` also maps ``_row_id`` to row position for edits and row
+lookups. For every filterable dimension column (Dealer, Product/Coverage, Year, Month,
+Make, Claim Status) a ``TableIndex`` keeps one sorted array of row positions per
+distinct value. ``apply_filters`` intersects those arrays and takes the rows once
+instead of scanning each column. A ``DateIndex`` keeps the rows ordered by the
+table's date column so date ranges are two binary searches, and a
+``SearchIndex`` holds one lowercased text line per row for the free-text
+``search`` filter, and an ``AggregateCube`` (see ``backend.core.cube``) holds
+pre-aggregated measures for metrics. Sort orders of the raw data are
+memoized per filter set, so the Data Manager grid pages without re-sorting.
+Indexes are registered against the DataFrame they describe, so any code
+filtering a registered frame picks them up without changes.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.core.cube import CUBE_ENABLED, AggregateCube
+from backend.core.utils import (
+    DATE_FILTER_COLUMNS, EQUALITY_FILTERS, filter_columns, filter_rows, find_column, filter_value, sort_positions,
+)
+
+
+def build_postings(series: pd.Series) -> dict[Any, np.ndarray]:
+    """Map each non-null value to the sorted positions where it occurs."""
+    codes, uniques = pd.factorize(series, sort=False)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    # Null rows carry code -1 and sort first
+    start = len(codes) - int(counts.sum())
+    postings = {}
+    for value, count in zip(uniques, counts):
+        postings[value] = order[start:start + count].astype(np.int64)
+        start += count
+    return postings
+
+
+def posting_arrays(postings: dict[Any, np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten postings to ``(values, bounds, positions)``: value i's rows are positions[bounds[i]:bounds[i + 1]]."""
+    values = np.empty(len(postings), dtype=object)
+    values[:] = list(postings)
+    bounds = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in postings.values()], out=bounds[1:])
+    positions = np.concatenate(list(postings.values())) if postings else np.empty(0)
+    return values, bounds, positions.astype(np.int64, copy=False)
+
+
+def postings_from(values: np.ndarray, bounds: np.ndarray, positions: np.ndarray) -> dict[Any, np.ndarray]:
+    """Inverse of ``posting_arrays``; each posting is a view into ``positions``."""
+    return {value: positions[bounds[i]:bounds[i + 1]] for i, value in enumerate(values)}
+
+
+def move_posting(postings: dict[Any, np.ndarray], position: int, old_value: Any, new_value: Any):
+    """Move ``position`` from ``old_value``'s postings to ``new_value``'s, in place."""
+    if not pd.isna(old_value) and old_value in postings:
+        arr = postings[old_value]
+        i = np.searchsorted(arr, position)
+        if i < len(arr) and arr[i] == position:
+            arr = np.delete(arr, i)
+            if len(arr):
+                postings[old_value] = arr
+            else:
+                del postings[old_value]
+    if not pd.isna(new_value):
+        arr = postings.get(new_value, np.empty(0, dtype=np.int64))
+        i = np.searchsorted(arr, position)
+        if i == len(arr) or arr[i] != position:
+            postings[new_value] = np.insert(arr, i, position)
+
+
+# Recent filter selections kept per table
+SELECTION_MEMO_SIZE = 32
+# Sort orders kept per table for paging the raw data
+SORT_MEMO_SIZE = 16
+# A first partial sort keeps this many times the rows asked for, covering the next pages
+SORT_PREFIX_FACTOR = 4
+# Above this many edited rows, postings are rebuilt rather than patched
+BULK_PATCH_ROWS = 256
+
+ROW_SEP = '\x1e'
+CELL_SEP = '\x1f'
+
+
+def _cell_text(series: pd.Series) -> np.ndarray:
+    """``str(value)`` of every cell, as the row-wise search used to see them."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime('%Y-%m-%d %H:%M:%S').where(series.notna(), 'NaT')
+    else:
+        text = series.astype(str)
+    return text.to_numpy(dtype=object)
+
+
+def _row_texts(df: pd.DataFrame) -> np.ndarray:
+    """One lowercased line per row with cells joined by CELL_SEP."""
+    if len(df.columns) == 0:
+        return np.full(len(df), '', dtype=object)
+    text = _cell_text(df.iloc[:, 0])
+    for i in range(1, len(df.columns)):
+        text = text + CELL_SEP + _cell_text(df.iloc[:, i])
+    return pd.Series(text, dtype=object).str.lower().to_numpy(dtype=object, copy=True)
+
+
+class SearchIndex:
+    """Substring search over every cell of a table.
+
+    Rows are kept as lowercased text lines and joined into one corpus, so a
+    query is a C-level ``str.find`` scan that only touches Python per matching
+    row. Edits rewrite the affected line; the corpus is re-joined lazily, once,
+    by whichever reader needs it first.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.texts = _row_texts(df)
+        self._corpus: Optional[str] = None
+        self._starts: Optional[np.ndarray] = None
+        self._corpus_lock = threading.Lock()
+
+    def _build_corpus(self):
+        with self._corpus_lock:
+            if self._corpus is not None:
+                return
+            lengths = np.fromiter((len(t) + 1 for t in self.texts), dtype=np.int64, count=len(self.texts))
+            self._starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            self._corpus = ROW_SEP.join(self.texts)
+
+    def search(self, needle: str, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Positions (within ``positions`` if given) whose text contains ``needle``."""
+        needle = needle.lower()
+        if positions is not None and len(positions) * 8 < len(self.texts):
+            return positions[np.fromiter((needle in self.texts[p] for p in positions),
+                                         dtype=bool, count=len(positions))]
+
+        if self._corpus is None:
+            self._build_corpus()
+        corpus, starts, hits = self._corpus, self._starts, []
+        at = corpus.find(needle)
+        while at != -1:
+            row = int(np.searchsorted(starts, at, side='right')) - 1
+            hits.append(row)
+            if row + 1 >= len(starts):
+                break
+            at = corpus.find(needle, int(starts[row + 1]))
+        found = np.asarray(hits, dtype=np.int64)
+        return found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+
+    def update_rows(self, df: pd.DataFrame, positions: np.ndarray):
+        """Re-render several rows after edits, in one pass over the columns."""
+        self.texts[positions] = _row_texts(df.take(positions))
+        self._corpus = None
+
+
+class DateIndex:
+    """Row positions ordered by a datetime column, for range filters."""
+
+    def __init__(self, series: pd.Series, order: Optional[np.ndarray] = None,
+                 sorted_values: Optional[np.ndarray] = None):
+        self.values = series.to_numpy()
+        if order is None:
+            valid = np.flatnonzero(~np.isnat(self.values))
+            order = valid[np.argsort(self.values[valid], kind='stable')]
+            sorted_values = self.values[order]
+        self.order = order
+        self.sorted = sorted_values
+
+    @property
+    def min(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.sorted[0]) if len(self.sorted) else None
+
+    @property
+    def max(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.sorted[-1]) if len(self.sorted) else None
+
+    def select(self, date_from: Optional[pd.Timestamp], date_to: Optional[pd.Timestamp],
+               positions: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Rows with ``date_from <= date <= date_to`` (either bound optional)."""
+        if date_from is None and date_to is None:
+            return positions
+        if positions is not None:
+            values = self.values[positions]
+            mask = ~np.isnat(values)
+            if date_from is not None:
+                mask &= values >= date_from.to_datetime64()
+            if date_to is not None:
+                mask &= values <= date_to.to_datetime64()
+            return positions[mask]
+
+        lo = 0 if date_from is None else np.searchsorted(self.sorted, date_from.to_datetime64(), side='left')
+        hi = len(self.sorted) if date_to is None else np.searchsorted(self.sorted, date_to.to_datetime64(), side='right')
+        return np.sort(self.order[lo:hi])
+
+
+class TableIndex:
+    """Value → row-position postings for one DataFrame's dimension columns.
+
+    ``arrays`` supplies prebuilt structures for the same data, e.g. a shared
+    generation's mapped files: ``{'postings': {column: posting_arrays(...)},
+    'dates': (order, sorted) or None}``. Anything it lacks is built.
+
+    Readers on several worker threads share one index. Postings and the date
+    order change only under the caller's write lock; the search index and
+    cube are built on first use, under ``_build_lock`` so only one reader
+    builds each.
+    """
+
+    def __init__(self, df: pd.DataFrame, arrays: Optional[dict] = None):
+        arrays = arrays or {'postings': {}, 'dates': None}
+        self.df_ref = weakref.ref(df)
+        self.n_rows = len(df)
+        self._search: Optional[SearchIndex] = None
+        self._cube: Optional[AggregateCube] = None
+        self._selections: OrderedDict = OrderedDict()
+        # (filters, column, ascending) -> (columns the order depends on, positions, complete)
+        self._orders: OrderedDict = OrderedDict()
+        # Readers on several worker threads share the memo
+        self._memo_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.date_column = find_column(df, DATE_FILTER_COLUMNS)
+        self.columns: dict[str, str] = {}
+        self.postings: dict[str, dict[Any, np.ndarray]] = {}
+        for key, candidates, _ in EQUALITY_FILTERS:
+            col = find_column(df, candidates)
+            if col:
+                self.columns[key] = col
+                if col in self.postings:
+                    continue
+                if col in arrays['postings']:
+                    self.postings[col] = postings_from(*arrays['postings'][col])
+                else:
+                    self.postings[col] = build_postings(df[col])
+        if arrays['dates'] is not None and self.date_column:
+            self._dates = DateIndex(df[self.date_column], *arrays['dates'])
+        else:
+            self._dates = self._build_dates(df)
+        # _row_id -> position; the hash table is built on first lookup
+        self.row_ids = pd.Index(df['_row_id']) if '_row_id' in df.columns else None
+
+    def position_of(self, row_id: Any) -> Optional[int]:
+        """Position of the row with this ``_row_id``, or None if there is none."""
+        if self.row_ids is None:
+            return None
+        try:
+            position = self.row_ids.get_loc(row_id)
+        except (KeyError, TypeError, pd.errors.InvalidIndexError):
+            return None
+        return position if isinstance(position, int) else None
+
+    def _build_dates(self, df: pd.DataFrame) -> Optional[DateIndex]:
+        if self.date_column and pd.api.types.is_datetime64_dtype(df[self.date_column]):
+            return DateIndex(df[self.date_column])
+        return None
+
+    def select(self, filters: dict) -> tuple[Optional[np.ndarray], set[str]]:
+        """Row positions matching the equality filters this index covers.
+
+        Returns ``(positions, handled_keys)``; ``positions`` is None when no
+        indexed filter is active.
+        """
+        lists, handled = [], set()
+        for key, _, cast in EQUALITY_FILTERS:
+            value = filter_value(filters, key, cast)
+            if value is None or key not in self.columns:
+                continue
+            handled.add(key)
+            lists.append(self.postings[self.columns[key]].get(value, np.empty(0, dtype=np.int64)))
+
+        if not lists:
+            return None, handled
+        lists.sort(key=len)
+        positions = lists[0]
+        for other in lists[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions, handled
+
+    @property
+    def dates(self) -> Optional[DateIndex]:
+        """The date-ordered index, or None if the table has no datetime date column."""
+        return self._dates
+
+    @property
+    def search(self) -> SearchIndex:
+        """The row-text search index, built on first use."""
+        search = self._search
+        if search is None:
+            with self._build_lock:
+                if self._search is None:
+                    self._search = SearchIndex(self.df_ref())
+                search = self._search
+        return search
+
+    @property
+    def cube(self) -> Optional[AggregateCube]:
+        """The aggregate cube, built on first use; None when disabled."""
+        cube = self._cube
+        if cube is None and CUBE_ENABLED:
+            with self._build_lock:
+                if self._cube is None:
+                    self._cube = AggregateCube(self.df_ref())
+                cube = self._cube
+        return cube
+
+    def remember_selection(self, filters: dict, compute: Callable[[], Optional[np.ndarray]]) -> Optional[np.ndarray]:
+        """Return the memoized selection for ``filters``, computing it on a miss."""
+        try:
+            key = tuple(sorted(filters.items()))
+            hash(key)
+        except TypeError:
+            return compute()
+        with self._memo_lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+        positions = compute()
+        with self._memo_lock:
+            self._selections[key] = positions
+            if len(self._selections) > SELECTION_MEMO_SIZE:
+                self._selections.popitem(last=False)
+        return positions
+
+    def sorted_rows(self, filters: dict, column: str, ascending: bool, stop: int) -> np.ndarray:
+        """Positions of the rows matching ``filters`` ordered by ``column``, at least the first ``stop``.
+
+        The order is memoized so paging doesn't re-sort the table per page.
+        The first request takes a partial sort of the leading rows; a page
+        past them sorts the full order once.
+        """
+        try:
+            key = (tuple(sorted(filters.items())), column, ascending)
+            hash(key)
+        except TypeError:
+            key = None
+        with self._memo_lock:
+            entry = self._orders.get(key) if key is not None else None
+            if entry is not None:
+                self._orders.move_to_end(key)
+        if entry is not None and (entry[2] or stop <= len(entry[1])):
+            return entry[1]
+
+        df = self.df_ref()
+        rows = filter_rows(df, filters)
+        values = df[column] if rows is None else df[column].take(rows)
+        limit = None if entry is not None else stop * SORT_PREFIX_FACTOR
+        order = sort_positions(values, ascending, limit)
+        if rows is not None:
+            order = rows[order]
+        if key is not None:
+            depends = filter_columns(df, filters)
+            if depends is not None:
+                depends = depends | {column}
+            with self._memo_lock:
+                self._orders[key] = (depends, order, len(order) == len(values))
+                if len(self._orders) > SORT_MEMO_SIZE:
+                    self._orders.popitem(last=False)
+        return order
+
+    def _forget_orders(self, column: Optional[str] = None):
+        """Drop memoized sort orders that read ``column`` (all of them when None)."""
+        with self._memo_lock:
+            for key in [k for k, (depends, _, _) in self._orders.items()
+                        if column is None or depends is None or column in depends]:
+                del self._orders[key]
+
+    def update_many(self, positions: np.ndarray, column: str, old_values: list, new_values: list):
+        """Patch the indexes after cells of one column changed.
+
+        Moves each row from its old value's postings to the new one's,
+        re-renders the rows' search text, recounts the cube cells involved,
+        rebuilds a stale date order and forgets memoized selections and the sort
+        orders that read the column. Large batches rebuild the column's
+        postings and drop the search text and cube instead of patching row by row.
+        """
+        self._selections.clear()
+        self._forget_orders(column)
+        if column == self.date_column:
+            self._dates = self._build_dates(self.df_ref())
+        if len(positions) > BULK_PATCH_ROWS:
+            self._search = None
+            self._cube = None
+            if column in self.postings:
+                self.postings[column] = build_postings(self.df_ref()[column])
+            return
+        postings = self.postings.get(column)
+        if postings is not None:
+            for position, old_value, new_value in zip(positions, old_values, new_values):
+                move_posting(postings, int(position), old_value, new_value)
+        if len(positions) and (self._search is not None or self._cube is not None):
+            df, positions = self.df_ref(), np.asarray(positions)
+            if self._search is not None:
+                self._search.update_rows(df, positions)
+            if self._cube is not None and not self._cube.update(df, positions, column):
+                self._cube = None
+
+
+# ─── Registry ──────────────────────────────────────────────
+
+_registry: dict[int, tuple[weakref.ref, TableIndex]] = {}
+
+
+def _forget(key: int, ref: weakref.ref):
+    entry = _registry.get(key)
+    if entry is not None and entry[0] is ref:
+        del _registry[key]
+
+
+def build_index(df: pd.DataFrame, arrays: Optional[dict] = None) -> TableIndex:
+    """Build an index for ``df`` (from ``arrays`` if given) and register it for ``get_index``."""
+    index = TableIndex(df, arrays)
+    key = id(df)
+    ref = weakref.ref(df, lambda r, key=key: _forget(key, r))
+    _registry[key] = (ref, index)
+    return index
+
+
+def get_index(df: pd.DataFrame) -> Optional[TableIndex]:
+    """Return the index registered for this exact DataFrame object, if any."""
+    entry = _registry.get(id(df))
+    if entry is None or entry[0]() is not df:
+        return None
+    index = entry[1]
+    return index if index.n_rows == len(df) else None
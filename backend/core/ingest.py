@@ -0,0 +1,298 @@
+"""
+Data file ingestion: parallel sheet parsing, table files and chunked uploads.
+
+``parse_sheets`` runs ``pd.read_excel`` for each requested sheet in its own
+worker process, since the sheets are independent and parsing is CPU-bound;
+the parsed frames come back pickled, which for typed columns is one buffer
+copy per block. Small workbooks, single-CPU hosts and platforms where worker
+processes can't be started parse in-process instead.
+
+``read_table`` loads a single table from CSV, Parquet or Arrow IPC, detected
+by magic bytes or extension, for feeds that skip Excel altogether.
+
+``read_workbook`` walks an ``.xlsx`` file with openpyxl in read-only mode and
+turns every ``CHUNK_ROWS`` rows into a typed DataFrame as it goes, so a large
+upload never holds the whole sheet as Python cell objects at once. Cells are
+converted the way ``pd.read_excel`` converts them, so both paths produce the
+same frames. Legacy ``.xls`` files, which openpyxl can't stream, are parsed
+whole. Progress is published on an ``IngestProgress`` that the upload status
+endpoint reports.
+"""
+
+import io
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+CHUNK_ROWS = int(os.environ.get('CLARITY_INGEST_CHUNK_ROWS', '5000'))
+PARALLEL_SHEETS = os.environ.get('CLARITY_PARALLEL_SHEETS', '1') != '0'
+# Below this size starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 2 << 20
+
+
+class IngestProgress:
+    """State of the current (or last) upload, safe to read while a worker updates it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {'state': 'idle'}
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return self._state['state'] in ('parsing', 'indexing')
+
+    def start(self, file_name: Optional[str], total_bytes: Optional[int]):
+        with self._lock:
+            self._state = {
+                'state': 'parsing', 'fileName': file_name, 'totalBytes': total_bytes,
+                'sheet': None, 'rowsParsed': 0, 'totalRows': None,
+                'startedAt': time.time(), 'finishedAt': None, 'error': None,
+            }
+
+    def update(self, **fields):
+        with self._lock:
+            self._state.update(fields)
+
+    def finish(self, error: Optional[str] = None):
+        with self._lock:
+            self._state.update(state='failed' if error else 'done', error=error, finishedAt=time.time())
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            state = dict(self._state)
+        if state.get('startedAt'):
+            end = state.get('finishedAt') or time.time()
+            state['elapsedSeconds'] = round(end - state['startedAt'], 2)
+        return state
+
+
+# ─── Parallel Sheets ───────────────────────────────────────
+
+def _parse_sheet(source: Union[str, bytes], sheet: str) -> pd.DataFrame:
+    return pd.read_excel(io.BytesIO(source) if isinstance(source, bytes) else source, sheet_name=sheet)
+
+
+def _usable_cpus() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_sheets(source: Union[str, bytes], sheets: list[str]) -> list[pd.DataFrame]:
+    """``pd.read_excel`` each of ``sheets`` from a path or bytes, one worker process per sheet."""
+    size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+    workers = min(len(sheets), _usable_cpus())
+    if PARALLEL_SHEETS and workers > 1 and size >= PARALLEL_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(_parse_sheet, [source] * len(sheets), sheets))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Parallel sheet parsing unavailable ({e}); parsing in-process")
+    return [_parse_sheet(source, sheet) for sheet in sheets]
+
+
+# ─── Table Files ───────────────────────────────────────────
+
+_EXTENSIONS = {
+    '.csv': 'csv', '.txt': 'csv', '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.xlsx': 'excel', '.xls': 'excel',
+}
+
+
+def _head(source, size: int = 8) -> bytes:
+    if isinstance(source, bytes):
+        return source[:size]
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+
+def detect_format(source, name: str = '') -> str:
+    """'excel', 'csv', 'parquet' or 'arrow' from a file's magic bytes, else its extension.
+
+    ``source`` is a path, bytes or a seekable binary file object; ``name``
+    supplies the extension when ``source`` isn't a path.
+    """
+    head = _head(source)
+    if head.startswith(b'PAR1'):
+        return 'parquet'
+    if head.startswith((b'ARROW1', b'FEA1')):
+        return 'arrow'
+    if head.startswith((b'PK\x03\x04', b'\xd0\xcf\x11\xe0')):
+        return 'excel'
+    name = name or (source if isinstance(source, str) else '')
+    return _EXTENSIONS.get(os.path.splitext(name)[1].lower(), 'csv')
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _from_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    """Give an Arrow-backed frame the dtypes the Excel path produces."""
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Dimension dictionaries are rebuilt across both tables at load
+            df[col] = df[col].astype(object)
+        elif dtype.kind == 'M' and dtype != 'datetime64[ns]':
+            df[col] = df[col].astype('datetime64[ns]')
+    return df
+
+
+def read_table(source, name: str = '') -> pd.DataFrame:
+    """Read one table from a CSV, Parquet or Arrow IPC file (path, bytes or binary file object).
+
+    CSV is parsed by pyarrow's multithreaded reader (pyarrow is a requirement;
+    without it pandas' C parser is used); Parquet and Arrow need pyarrow.
+    """
+    fmt = detect_format(source, name)
+    if fmt == 'excel':
+        raise ValueError("Excel workbooks hold both tables; load them with load_excel")
+    handle = io.BytesIO(source) if isinstance(source, bytes) else source
+    if fmt == 'csv':
+        if not _has_pyarrow():
+            return pd.read_csv(handle)
+        return _from_arrow(pd.read_csv(handle, engine='pyarrow'))
+    if not _has_pyarrow():
+        raise ValueError(f"Reading {fmt} files needs pyarrow (pip install pyarrow)")
+    if fmt == 'parquet':
+        return _from_arrow(pd.read_parquet(handle))
+    return _from_arrow(pd.read_feather(handle))
+
+
+# ─── Chunked Reading ───────────────────────────────────────
+
+def _convert_cell(cell):
+    """Cell value as ``pd.read_excel``'s openpyxl reader returns it."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ''
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _parse_rows(rows: list[list], columns: Optional[list] = None) -> pd.DataFrame:
+    """Type one chunk of converted rows; the first chunk carries the header row."""
+    if columns is None:
+        return TextParser(rows, header=0, skip_blank_lines=False).read()
+    width = len(columns)
+    rows = [row[:width] + [''] * (width - len(row)) for row in rows]
+    return TextParser(rows, header=None, names=columns, skip_blank_lines=False).read()
+
+
+def _combine(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, reconciling column types the way one whole-sheet parse would.
+
+    A chunk whose column came out all-empty takes the others' date type, and
+    booleans in a column that has blanks elsewhere become floats.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        dtypes = {f[col].dtype for f in frames}
+        if len(dtypes) == 1:
+            continue
+        filled = {f[col].dtype for f in frames if f[col].notna().any()}
+        if len(filled) == 1 and next(iter(filled)).kind == 'M':
+            target = next(iter(filled))
+        elif {d.kind for d in dtypes} == {'b', 'f'}:
+            target = np.dtype(np.float64)
+        else:
+            continue
+        for f in frames:
+            f[col] = f[col].astype(target)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _read_sheet(ws, on_rows: Callable[[int], None]) -> pd.DataFrame:
+    """Read one worksheet in chunks of ``CHUNK_ROWS`` rows."""
+    ws.reset_dimensions()
+    frames, chunk, blank = [], [], []
+    columns = None
+    parsed = 0
+
+    def flush():
+        nonlocal columns, parsed
+        if columns is None:
+            width = max(len(row) for row in chunk)
+            chunk[:] = [row + [''] * (width - len(row)) for row in chunk]
+        frame = _parse_rows(chunk, columns)
+        columns = list(frame.columns)
+        frames.append(frame)
+        parsed += len(frame)
+        chunk.clear()
+        on_rows(parsed)
+
+    for cells in ws.rows:
+        row = [_convert_cell(cell) for cell in cells]
+        while row and row[-1] == '':
+            row.pop()
+        if not row:
+            # Blank rows count only if more data follows, as in pd.read_excel
+            blank.append(row)
+            continue
+        chunk.extend(blank)
+        blank.clear()
+        chunk.append(row)
+        if len(chunk) > CHUNK_ROWS:
+            flush()
+    if chunk:
+        flush()
+    if not frames:
+        raise ValueError(f"Sheet {ws.title!r} is empty")
+    return _combine(frames)
+
+
+def read_workbook(fileobj: BinaryIO, pick_sheets: Callable[[list[str]], tuple[str, str]],
+                  progress: Optional[IngestProgress] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Parse the two sheets ``pick_sheets`` chooses from a workbook file object."""
+    progress = progress or IngestProgress()
+    fileobj.seek(0)
+    if not zipfile.is_zipfile(fileobj):
+        # Legacy .xls: no streaming reader, parse it whole
+        fileobj.seek(0)
+        xls = pd.ExcelFile(fileobj)
+        frames = []
+        for sheet in pick_sheets(xls.sheet_names):
+            progress.update(sheet=sheet, rowsParsed=0, totalRows=None)
+            frames.append(pd.read_excel(xls, sheet))
+            progress.update(rowsParsed=len(frames[-1]))
+        return frames[0], frames[1]
+
+    import openpyxl
+
+    fileobj.seek(0)
+    wb = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        frames = []
+        for sheet in pick_sheets(wb.sheetnames):
+            ws = wb[sheet]
+            total = ws.max_row - 1 if ws.max_row else None
+            progress.update(sheet=sheet, rowsParsed=0, totalRows=total)
+            frames.append(_read_sheet(ws, lambda n: progress.update(rowsParsed=n)))
+        return frames[0], frames[1]
+    finally:
+        wb.close()
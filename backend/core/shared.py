@@ -0,0 +1,294 @@
+"""
+Dataset generations shared by several server processes.
+
+Run with several uvicorn workers, each process would otherwise parse the
+workbook and hold its own copy of every table. With shared data on, the
+tables live in a *generation*: a snapshot-format directory (one ``.npy`` file
+per column, see ``snapshot``) under ``SHARED_DIR``, by default in ``/dev/shm``.
+Workers memory-map it read-only, so the OS keeps one copy of each column
+however many processes attach. Nothing in a generation is pickled, and
+``SHARED_DIR`` must be owned by this user with mode 0700.
+
+Writes are serialized by an exclusive ``flock``: the process holding it
+catches up with the newest generation, applies the edit (which copies only
+the touched columns) and publishes the result as the next generation,
+in which every column it didn't change is a hard link to the previous file.
+``CURRENT`` names the newest generation; the other workers see it change and
+re-attach before their next request. They attach under a shared lock on
+``readers.lock``, and old generations are only removed while nobody holds it.
+
+The first worker to start loads the source and publishes generation 1, the
+rest attach to it. A generation records the server run that published it, so
+a restart reloads the source instead of resuming the last run's edits.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.core import snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SHARED_DATA = os.environ.get('CLARITY_SHARED_DATA', '0') != '0'
+SHARED_DIR = os.environ.get('CLARITY_SHARED_DIR', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    f'clarity-bi-shared{snapshot._USER_SUFFIX}'))
+# Generations kept besides the newest, for workers still attaching to them
+KEEP_GENERATIONS = 2
+
+
+def _same_column(a: pd.Series, b: pd.Series) -> bool:
+    """Whether ``b`` can reuse the file written for ``a``."""
+    from backend.core.data_manager import _shares_buffer
+
+    if a.dtype != b.dtype or len(a) != len(b):
+        return False
+    # merged_df repeats the sales columns as copies, and text columns are decoded per table
+    return _shares_buffer(a, b) or a.equals(b)
+
+
+def _link(source_dir: str, sources: list[str], target_dir: str, targets: list[str]):
+    for source, target in zip(sources, targets):
+        os.link(os.path.join(source_dir, source), os.path.join(target_dir, target))
+
+
+# Posting values are arbitrary cell values, stored like text columns (``snapshot.save_objects``)
+_POSTING_FILES = ('values.npz', 'bounds.npy', 'positions.npy')
+_DATE_FILES = ('order', 'sorted')
+
+
+def _write_index(table_dir: str, index, unchanged: set, previous: Optional[tuple[str, dict]]) -> dict:
+    """Write a table's postings and date order, linking those of columns unchanged since ``previous``.
+
+    Postings and the date order depend only on their column, so an unchanged
+    column's files from the previous generation still describe it.
+    """
+    from backend.core.indexes import posting_arrays
+
+    old_dir, old_spec = previous or (None, {'postings': {}, 'dates': None})
+    spec = {'postings': {}, 'dates': None}
+    for i, (col, postings) in enumerate(index.postings.items()):
+        name, files = f'p{i}', [f'p{i}.{part}' for part in _POSTING_FILES]
+        old = old_spec['postings'].get(col)
+        if col in unchanged and old is not None:
+            _link(old_dir, [f'{old}.{part}' for part in _POSTING_FILES], table_dir, files)
+        else:
+            values, bounds, positions = posting_arrays(postings)
+            snapshot.save_objects(os.path.join(table_dir, files[0]), values)
+            np.save(os.path.join(table_dir, files[1]), bounds)
+            np.save(os.path.join(table_dir, files[2]), positions)
+        spec['postings'][col] = name
+    dates = index.dates
+    if dates is not None:
+        files = [f'd.{part}.npy' for part in _DATE_FILES]
+        old = old_spec['dates']
+        if index.date_column in unchanged and old is not None and old['column'] == index.date_column:
+            _link(old_dir, [f'd.{part}.npy' for part in _DATE_FILES], table_dir, files)
+        else:
+            np.save(os.path.join(table_dir, files[0]), dates.order)
+            np.save(os.path.join(table_dir, files[1]), dates.sorted)
+        spec['dates'] = {'column': index.date_column}
+    return spec
+
+
+def _read_index(table_dir: str, spec: dict) -> dict:
+    """Index arrays for ``TableIndex(df, arrays)``, mapped from a table's index files."""
+    def load(file):
+        if file.endswith('.npz'):
+            return snapshot.load_objects(os.path.join(table_dir, file))
+        return np.asarray(np.load(os.path.join(table_dir, file), mmap_mode='r'))
+
+    return {
+        'postings': {col: tuple(load(f'{name}.{part}') for part in _POSTING_FILES)
+                     for col, name in spec['postings'].items()},
+        'dates': tuple(load(f'd.{part}.npy') for part in _DATE_FILES) if spec['dates'] else None,
+    }
+
+
+def _write_generation(directory: str, tables: dict[str, pd.DataFrame], meta: dict, previous: dict):
+    """Write a generation, hard-linking columns found unchanged in ``previous`` or earlier in it.
+
+    ``previous`` describes the generation being replaced: ``columns`` maps
+    column names to ``(series, table, table_dir, file_name, entry)`` and
+    ``indexes`` maps tables to ``(table_dir, index spec)``.
+    """
+    from backend.core.indexes import get_index
+
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(directory))
+    try:
+        candidates = {name: list(found) for name, found in previous.get('columns', {}).items()}
+        manifest = {'format': snapshot.FORMAT_VERSION, 'meta': meta, 'tables': {}}
+        for table, df in tables.items():
+            table_dir = os.path.join(staging, table)
+            os.makedirs(table_dir)
+            columns, unchanged = [], set()
+            for i, col in enumerate(df.columns):
+                name, series = f'c{i}', df[col]
+                match = next((c for c in candidates.get(col, ()) if _same_column(c[0], series)), None)
+                if match is not None:
+                    _, source_table, source_dir, source_name, entry = match
+                    _link(source_dir, snapshot._column_files(source_name, entry),
+                          table_dir, snapshot._column_files(name, entry))
+                    entry = dict(entry)
+                    if source_table == table and not source_dir.startswith(staging):
+                        unchanged.add(col)
+                else:
+                    entry = snapshot._write_column(table_dir, name, series)
+                entry['name'] = col
+                columns.append(entry)
+                candidates.setdefault(col, []).append((series, table, table_dir, name, entry))
+            manifest['tables'][table] = {'rows': len(df), 'columns': columns}
+            index = get_index(df)
+            if index is not None:
+                manifest['tables'][table]['index'] = _write_index(
+                    table_dir, index, unchanged, previous.get('indexes', {}).get(table))
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, default=str)
+        os.replace(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+class SharedDataset:
+    """This process's view of the shared generations under ``root``."""
+
+    def __init__(self, root: str = SHARED_DIR, run: Optional[str] = None):
+        if fcntl is None:
+            raise RuntimeError("Shared data needs POSIX file locks")
+        self.root = root
+        # Workers of one server share their parent; launchers may name the run instead
+        self.run = run or os.environ.get('CLARITY_SHARED_RUN') or str(os.getppid())
+        # Every worker loads what is published here, so it must be ours alone (mode 0700)
+        snapshot.private_dir(root)
+        # Generation this process serves, and its files for publishing the next
+        self.generation: Optional[str] = None
+        self._files: dict = {}
+
+    @contextmanager
+    def _locked(self, name: str, operation: int):
+        with open(os.path.join(self.root, name), 'a') as f:
+            fcntl.flock(f, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _writer(self):
+        return self._locked('writer.lock', fcntl.LOCK_EX)
+
+    def _current(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def stale(self) -> bool:
+        """Whether another process published a generation this one hasn't attached."""
+        return self._current() != self.generation
+
+    def load(self, manager, loader: Optional[Callable[[], None]] = None) -> bool:
+        """Attach ``manager`` to this run's data, or run ``loader`` on it and publish the result.
+
+        Only one process loads; the others wait for it and attach. A
+        generation left by an earlier server run is never attached, so it is
+        loaded over. Returns True if this process ran ``loader``.
+        """
+        with self._writer():
+            if self.sync(manager) or loader is None:
+                return False
+            loader()
+            self._publish(manager)
+            return True
+
+    def sync(self, manager) -> bool:
+        """Re-attach ``manager`` to the newest generation if another process published one.
+
+        Returns whether ``manager`` now serves this run's newest generation:
+        False when there is none yet, or the newest is an earlier run's.
+        """
+        # Held while reading the files, so _publish can't remove the generation meanwhile
+        with self._locked('readers.lock', fcntl.LOCK_SH):
+            current = self._current()
+            if current is None:
+                return False
+            if current == self.generation:
+                return True
+            if not self._attach(manager, current):
+                return False
+        self.generation = current
+        return True
+
+    def _attach(self, manager, name: str) -> bool:
+        """Attach ``manager`` to generation ``name``; False, changing nothing, if it is another run's."""
+        directory = os.path.join(self.root, name)
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest['meta'].get('run') != self.run:
+            # Left over from an earlier server run: not ours to serve
+            return False
+        tables, meta = snapshot.read_tables(directory)
+        columns, indexes, index_specs = {}, {}, {}
+        for table, spec in manifest['tables'].items():
+            table_dir = os.path.join(directory, table)
+            for i, entry in enumerate(spec['columns']):
+                columns.setdefault(entry['name'], []).append(
+                    (tables[table][entry['name']], table, table_dir, f'c{i}', entry))
+            if 'index' in spec:
+                indexes[table] = _read_index(table_dir, spec['index'])
+                index_specs[table] = (table_dir, spec['index'])
+        self._files = {'columns': columns, 'indexes': index_specs}
+        manager.attach(tables, meta, indexes)
+        return True
+
+    def write(self, manager, fn: Callable, *args):
+        """Run ``fn(*args)`` against ``manager`` as the only writer; publish if it changed the data."""
+        with self._writer():
+            self.sync(manager)
+            version = manager.version
+            result = fn(*args)
+            if manager.version != version:
+                self._publish(manager)
+            return result
+
+    def _publish(self, manager):
+        tables, meta = manager.shared_state()
+        meta['run'] = self.run
+        current = self._current()
+        number = int(current.split('-')[1]) + 1 if current else 1
+        name = f'gen-{number:06d}'
+        _write_generation(os.path.join(self.root, name), tables, meta, self._files)
+        pointer = os.path.join(self.root, '.CURRENT.tmp')
+        with open(pointer, 'w') as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(self.root, 'CURRENT'))
+        # Serve the published files too, so this process drops its private copies
+        self.sync(manager)
+        self._prune(number - KEEP_GENERATIONS)
+
+    def _prune(self, oldest: int):
+        """Remove generations numbered below ``oldest``, unless a process is attaching right now."""
+        with open(os.path.join(self.root, 'readers.lock'), 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # The next publish removes them
+                return
+            try:
+                for entry in os.listdir(self.root):
+                    if entry.startswith('gen-') and int(entry.split('-')[1]) < oldest:
+                        # Processes that attached keep their mapped pages until they move on
+                        shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,286 @@
+"""
+Columnar on-disk snapshots of the normalized Sales & Claims tables.
+
+Parsing the workbook with pandas dominates cold start, so after a successful
+Excel load the normalized frames are written one ``.npy`` file per column and
+memory-mapped back on the next start. Snapshots are keyed by the source file's
+size, mtime and content hash; anything stale, missing or unreadable simply
+returns ``None`` and the caller falls back to the Excel path.
+
+Nothing is pickled: text and mixed-type columns are stored as a type tag per
+value plus their text (see ``save_objects``), and every file is loaded with
+``allow_pickle=False``. The snapshot directory must be private (owned by this
+user, mode 0700); one that isn't is refused rather than trusted.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever load-time normalization changes so old snapshots are rebuilt
+FORMAT_VERSION = 5
+# Per-user name, so users of one machine never share (or squat on) a directory
+_USER_SUFFIX = f'-{os.getuid()}' if hasattr(os, 'getuid') else ''
+SNAPSHOT_DIR = os.environ.get(
+    'CLARITY_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), f'clarity-bi-snapshots{_USER_SUFFIX}')
+)
+SNAPSHOTS_ENABLED = os.environ.get('CLARITY_SNAPSHOTS', '1') != '0'
+
+
+def private_dir(path: str) -> str:
+    """Create ``path`` with mode 0700 if needed; raise PermissionError unless it is ours and private.
+
+    Snapshots are loaded as trusted data, so a directory someone else could
+    create or write to first must not be used.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if hasattr(os, 'getuid'):
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"{path} is owned by uid {st.st_uid}, not this user")
+        if st.st_mode & 0o077:
+            raise PermissionError(f"{path} is accessible to other users (mode {stat.S_IMODE(st.st_mode):o}); "
+                                  f"expected 0700")
+    return path
+
+
+def source_fingerprint(file_path: str) -> dict:
+    """Size, mtime and SHA-1 of a source file."""
+    st = os.stat(file_path)
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': digest.hexdigest()}
+
+
+def _source_dir(file_path: str, root: str) -> str:
+    key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(root, key)
+
+
+def _snapshot_key(fingerprint: dict) -> str:
+    raw = f"{fingerprint['size']}-{fingerprint['mtime_ns']}-{fingerprint['sha1']}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+# ─── Column Encoding ───────────────────────────────────────
+
+# Type tags of values stored by ``save_objects``, with how each is rebuilt from its text
+_NONE, _STR, _INT, _FLOAT, _BOOL, _TIMESTAMP, _DATETIME, _DATE, _TIME, _NAT = range(10)
+_DECODERS = {
+    _NONE: lambda text: None,
+    _STR: str,
+    _INT: int,
+    _FLOAT: float,
+    _BOOL: lambda text: text == '1',
+    _TIMESTAMP: pd.Timestamp,
+    _DATETIME: datetime.datetime.fromisoformat,
+    _DATE: datetime.date.fromisoformat,
+    _TIME: datetime.time.fromisoformat,
+    _NAT: lambda text: pd.NaT,
+}
+
+
+def _encode_value(value: Any) -> tuple[int, str]:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None:
+        return _NONE, ''
+    if value is pd.NaT:
+        return _NAT, ''
+    if isinstance(value, str):
+        return _STR, value
+    if isinstance(value, bool):
+        return _BOOL, '1' if value else '0'
+    if isinstance(value, int):
+        return _INT, str(value)
+    if isinstance(value, float):
+        return _FLOAT, repr(value)
+    if isinstance(value, pd.Timestamp):
+        return _TIMESTAMP, value.isoformat()
+    if isinstance(value, datetime.datetime):
+        return _DATETIME, value.isoformat()
+    if isinstance(value, datetime.date):
+        return _DATE, value.isoformat()
+    if isinstance(value, datetime.time):
+        return _TIME, value.isoformat()
+    raise TypeError(f"cannot store a {type(value).__name__} value in a snapshot")
+
+
+def save_objects(path: str, values) -> None:
+    """Write an object array to ``path`` (``.npz``) without pickling it.
+
+    Each value keeps a type tag, and all their text is stored as one UTF-8
+    buffer with character offsets, so loading decodes it once and slices.
+    """
+    kinds = np.empty(len(values), dtype=np.int8)
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    parts = []
+    for i, value in enumerate(values):
+        kinds[i], text = _encode_value(value)
+        parts.append(text)
+        offsets[i + 1] = offsets[i] + len(text)
+    text = np.frombuffer(''.join(parts).encode('utf-8', 'surrogatepass'), dtype=np.uint8)
+    with open(path, 'wb') as f:
+        np.savez(f, kinds=kinds, offsets=offsets, text=text)
+
+
+def load_objects(path: str) -> np.ndarray:
+    """Read back an object array written by ``save_objects``."""
+    with np.load(path, allow_pickle=False) as files:
+        kinds, offsets = files['kinds'], files['offsets'].tolist()
+        text = files['text'].tobytes().decode('utf-8', 'surrogatepass')
+    strings = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    values = np.empty(len(strings), dtype=object)
+    if len(strings) and (kinds == _STR).all():
+        values[:] = strings
+    else:
+        values[:] = [_DECODERS[kind](string) for kind, string in zip(kinds.tolist(), strings)]
+    return values
+
+
+def _write_column(directory: str, name: str, series: pd.Series) -> dict:
+    """Write one column and return its manifest entry."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        np.save(os.path.join(directory, f'{name}.codes.npy'), series.cat.codes.to_numpy())
+        save_objects(os.path.join(directory, f'{name}.cats.npz'), series.cat.categories.to_numpy(dtype=object))
+        return {'kind': 'category', 'ordered': bool(series.cat.ordered)}
+
+    values = series.to_numpy()
+    if values.dtype.kind in 'biufmM':
+        np.save(os.path.join(directory, f'{name}.npy'), values)
+        return {'kind': 'array'}
+
+    save_objects(os.path.join(directory, f'{name}.npz'), values)
+    return {'kind': 'object'}
+
+
+def _column_files(name: str, entry: dict) -> list[str]:
+    """File names holding one column, the main one first."""
+    if entry['kind'] == 'category':
+        return [f'{name}.codes.npy', f'{name}.cats.npz']
+    if entry['kind'] == 'object':
+        return [f'{name}.npz']
+    return [f'{name}.npy']
+
+
+def _read_column(directory: str, name: str, entry: dict):
+    if entry['kind'] == 'category':
+        codes = np.asarray(np.load(os.path.join(directory, f'{name}.codes.npy'), mmap_mode='r'))
+        cats = pd.Index(list(load_objects(os.path.join(directory, f'{name}.cats.npz'))))
+        dtype = pd.CategoricalDtype(cats, ordered=entry.get('ordered', False))
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+    if entry['kind'] == 'array':
+        # Plain ndarray view over the mapping so memmap subclasses don't leak into results
+        return np.asarray(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'))
+    return load_objects(os.path.join(directory, f'{name}.npz'))
+
+
+def write_tables(directory: str, tables: dict[str, pd.DataFrame], meta: Optional[dict] = None):
+    """Write ``{name: DataFrame}`` as a columnar snapshot, atomically replacing ``directory``."""
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+    try:
+        manifest = {'format': FORMAT_VERSION, 'meta': meta or {}, 'tables': {}}
+        for table, df in tables.items():
+            table_dir = os.path.join(staging, table)
+            os.makedirs(table_dir)
+            columns = []
+            for i, col in enumerate(df.columns):
+                entry = _write_column(table_dir, f'c{i}', df[col])
+                entry['name'] = col
+                columns.append(entry)
+            manifest['tables'][table] = {'rows': len(df), 'columns': columns}
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+
+        if os.path.exists(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_tables(directory: str) -> tuple[dict[str, pd.DataFrame], dict]:
+    """Memory-map a snapshot back into DataFrames. Returns ``(tables, meta)``."""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"snapshot format {manifest.get('format')} is outdated")
+
+    tables = {}
+    # Hard-linked column files (see ``shared``) are read once and shared between tables
+    loaded = {}
+    for table, spec in manifest['tables'].items():
+        table_dir = os.path.join(directory, table)
+        data = {}
+        for i, entry in enumerate(spec['columns']):
+            st = os.stat(os.path.join(table_dir, _column_files(f'c{i}', entry)[0]))
+            key = (st.st_dev, st.st_ino)
+            if key not in loaded:
+                loaded[key] = _read_column(table_dir, f'c{i}', entry)
+            data[entry['name']] = loaded[key]
+        # copy=False keeps one block per column backed by the mapped file
+        tables[table] = pd.DataFrame(data, copy=False)
+    return tables, manifest.get('meta', {})
+
+
+# ─── Source-keyed Cache ────────────────────────────────────
+
+def load_for_source(file_path: str, root: str = None,
+                    variant: str = '') -> Optional[dict[str, pd.DataFrame]]:
+    """Return the cached tables for ``file_path``, or None if missing or stale.
+
+    ``variant`` names load settings baked into the tables (e.g. the float
+    width); a snapshot written under different settings counts as stale.
+    """
+    if not SNAPSHOTS_ENABLED:
+        return None
+    root = root or SNAPSHOT_DIR
+    try:
+        private_dir(root)
+        fingerprint = source_fingerprint(file_path)
+        directory = os.path.join(_source_dir(file_path, root), _snapshot_key(fingerprint))
+        if not os.path.exists(os.path.join(directory, 'manifest.json')):
+            return None
+        tables, meta = read_tables(directory)
+        if meta.get('source') != fingerprint or meta.get('variant', '') != variant:
+            return None
+        return tables
+    except Exception as e:
+        print(f"Ignoring snapshot for {file_path}: {e}")
+        return None
+
+
+def save_for_source(file_path: str, tables: dict[str, pd.DataFrame], root: str = None,
+                    variant: str = '') -> bool:
+    """Persist tables for ``file_path`` and prune older snapshots of the same source."""
+    if not SNAPSHOTS_ENABLED:
+        return False
+    root = root or SNAPSHOT_DIR
+    try:
+        private_dir(root)
+        fingerprint = source_fingerprint(file_path)
+        source_dir = _source_dir(file_path, root)
+        key = _snapshot_key(fingerprint)
+        write_tables(os.path.join(source_dir, key), tables, meta={'source': fingerprint, 'variant': variant})
+        for name in os.listdir(source_dir):
+            if name != key and not name.startswith('.staging-'):
+                shutil.rmtree(os.path.join(source_dir, name), ignore_errors=True)
+        return True
+    except Exception as e:
+        print(f"Could not write snapshot for {file_path}: {e}")
+        return False
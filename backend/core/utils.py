@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Optional, Any
@@ -9,55 +10,323 @@ def find_column(df: pd.DataFrame, candidates: list[str]) -> Optional[str]:
             return c
     return None
 
-def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    """Apply common filters to a dataframe."""
-    result = df.copy()
-
-    if filters.get('dealer') and filters['dealer'] != 'All':
-        dealer_col = find_column(result, ['Dealer', 'Dealer AJA'])
-        if dealer_col:
-            result = result[result[dealer_col] == filters['dealer']]
-
-    if filters.get('product') and filters['product'] != 'All':
-        prod_col = find_column(result, ['Product', 'Coverage'])
-        if prod_col:
-            result = result[result[prod_col] == filters['product']]
-
-    if filters.get('year') and filters['year'] != 'All':
-        if 'Year' in result.columns:
-            result = result[result['Year'] == int(filters['year'])]
-
-    if filters.get('month') and filters['month'] != 'All':
-        if 'Month' in result.columns:
-            result = result[result['Month'] == int(filters['month'])]
-
-    if filters.get('make') and filters['make'] != 'All':
-        if 'Make' in result.columns:
-            result = result[result['Make'] == filters['make']]
-
-    if filters.get('date_from'):
-        date_col = find_column(result, ['Policy Sold Date', 'Failure Date'])
-        if date_col and date_col in result.columns:
-            try:
-                result = result[pd.to_datetime(result[date_col]) >= pd.to_datetime(filters['date_from'])]
-            except Exception:
-                pass
-
-    if filters.get('date_to'):
-        date_col = find_column(result, ['Policy Sold Date', 'Failure Date'])
-        if date_col and date_col in result.columns:
-            try:
-                result = result[pd.to_datetime(result[date_col]) <= pd.to_datetime(filters['date_to'])]
-            except Exception:
-                pass
+# (filter key, candidate columns, value cast) for the plain equality filters
+EQUALITY_FILTERS = [
+    ('dealer', ['Dealer', 'Dealer AJA'], None),
+    ('product', ['Product', 'Coverage'], None),
+    ('year', ['Year'], int),
+    ('month', ['Month'], int),
+    ('make', ['Make'], None),
+    ('claim_status', ['Claim Status'], None),
+]
 
-    if filters.get('search'):
+# Columns the date_from/date_to filters apply to, in order of preference
+DATE_FILTER_COLUMNS = ['Policy Sold Date', 'Failure Date']
+
+def filter_value(filters: dict, key: str, cast=None) -> Any:
+    """Return the active value of an equality filter, or None if unset/'All'."""
+    value = filters.get(key)
+    if not value or value == 'All':
+        return None
+    return cast(value) if cast else value
+
+def parse_date_bound(value) -> Optional[pd.Timestamp]:
+    """Parse a date_from/date_to filter value; None if unset or unusable."""
+    if not value:
+        return None
+    try:
+        bound = pd.Timestamp(pd.to_datetime(value))
+    except Exception:
+        return None
+    # Timezone-aware bounds can't be compared with the naive sheet dates
+    return None if pd.isna(bound) or bound.tzinfo is not None else bound
+
+def _narrow(positions: Optional[np.ndarray], mask) -> np.ndarray:
+    """Keep the selected positions where ``mask`` (aligned to them) is True."""
+    mask = np.asarray(mask, dtype=bool)
+    return np.flatnonzero(mask) if positions is None else positions[mask]
+
+def filter_rows(df: pd.DataFrame, filters: dict) -> Optional[np.ndarray]:
+    """Positions of the rows matching ``filters``, or None when no filter applies.
+
+    Equality, date-range and search filters are answered from the table's
+    indexes when one is registered (see ``backend.core.indexes``), falling
+    back to column scans. Later predicates only look at the rows still selected.
+    Indexed tables also remember recent selections, so the metrics behind one
+    dashboard refresh filter each table once.
+    """
+    from backend.core.indexes import get_index
+
+    index = get_index(df)
+    if index is None:
+        return _select_rows(df, filters, None)
+    return index.remember_selection(filters, lambda: _select_rows(df, filters, index))
+
+def _select_rows(df: pd.DataFrame, filters: dict, index) -> Optional[np.ndarray]:
+    positions, handled = None, set()
+    if index is not None:
+        positions, handled = index.select(filters)
+
+    def column(col):
+        s = df[col]
+        return s if positions is None else s.take(positions)
+
+    for key, candidates, cast in EQUALITY_FILTERS:
+        if key in handled:
+            continue
+        value = filter_value(filters, key, cast)
+        if value is None:
+            continue
+        col = find_column(df, candidates)
+        if col:
+            positions = _narrow(positions, column(col) == value)
+
+    date_col = find_column(df, DATE_FILTER_COLUMNS)
+    if date_col and (filters.get('date_from') or filters.get('date_to')):
+        dates = index.dates if index is not None else None
+        if dates is not None:
+            positions = dates.select(parse_date_bound(filters.get('date_from')),
+                                     parse_date_bound(filters.get('date_to')), positions)
+        else:
+            for key, op in (('date_from', 'ge'), ('date_to', 'le')):
+                if not filters.get(key):
+                    continue
+                try:
+                    bound = pd.to_datetime(filters[key])
+                    positions = _narrow(positions, getattr(pd.to_datetime(column(date_col)), op)(bound))
+                except Exception:
+                    pass
+
+    if filters.get('search') and (positions is None or len(positions)):
         search = filters['search'].lower()
-        mask = result.apply(lambda row: any(search in str(v).lower() for v in row), axis=1)
-        result = result[mask]
+        if index is not None:
+            positions = index.search.search(search, positions)
+        else:
+            rows = df if positions is None else df.take(positions)
+            mask = rows.apply(lambda row: any(search in str(v).lower() for v in row), axis=1)
+            positions = _narrow(positions, mask)
+
+    return positions
+
+def filter_columns(df: pd.DataFrame, filters: dict) -> Optional[set[str]]:
+    """Columns of ``df`` that ``filters`` read, or None if they read every column (search)."""
+    if not filters:
+        return set()
+    if filters.get('search'):
+        return None
+    cols = set()
+    for key, candidates, _ in EQUALITY_FILTERS:
+        value = filters.get(key)
+        if value and value != 'All':
+            col = find_column(df, candidates)
+            if col:
+                cols.add(col)
+    date_col = find_column(df, DATE_FILTER_COLUMNS)
+    if date_col and (filters.get('date_from') or filters.get('date_to')):
+        cols.add(date_col)
+    return cols
+
+
+# A partial sort only pays off while the rows wanted are a small share of the table
+PARTIAL_SORT_FRACTION = 8
+
+def _sort_key(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """A numeric array ordering like ``values``, and the mask of missing entries."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Categoricals sort by category order, which is what the codes follow
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+        return codes, codes < 0
+    if isinstance(dtype, np.dtype) and dtype.kind in 'mM':
+        raw = values.to_numpy()
+        return raw.view(np.int64), np.isnat(raw)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        raw = values.to_numpy()
+        if dtype.kind == 'f':
+            return raw, np.isnan(raw)
+        return raw.astype(np.int64), np.zeros(len(raw), dtype=bool)
+    codes, _ = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), codes < 0
+
+def sort_positions(values: pd.Series, ascending: bool = True, limit: Optional[int] = None) -> np.ndarray:
+    """Positions into ``values`` in ``values.sort_values(kind='stable')`` order.
+
+    Missing values go last and ties keep row order in both directions. With
+    ``limit`` only the first ``limit`` positions are returned; when that is a
+    small share of the rows they come from a partial sort (``np.partition``
+    picks the cut-off value and only rows up to it are sorted).
+    """
+    key, missing = _sort_key(values)
+    present = np.flatnonzero(~missing)
+    keys = key[present] if ascending else -key[present]
+    if limit is not None and 0 < limit and limit * PARTIAL_SORT_FRACTION < len(keys):
+        cutoff = np.partition(keys, limit - 1)[limit - 1]
+        # Everything tied with the cut-off takes part, so ties still break by position
+        candidates = np.flatnonzero(keys <= cutoff)
+        order = candidates[np.argsort(keys[candidates], kind='stable')[:limit]]
+        return present[order]
+    order = np.concatenate([present[np.argsort(keys, kind='stable')], np.flatnonzero(missing)])
+    return order if limit is None else order[:limit]
+
+def _seek_keys(values: pd.Series, value) -> tuple[np.ndarray, Any, Any]:
+    """Per-row keys ordered like ``_sort_key``, ``value`` as such a key, and the missing-key test."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        target = None if value is None else values.cat.categories.get_loc(value)
+        return values.cat.codes.to_numpy(), target, lambda k: k < 0
+    raw = values.to_numpy()
+    if isinstance(dtype, np.dtype) and dtype.kind in 'mM':
+        if value is not None:
+            value = pd.Timestamp(value) if dtype.kind == 'M' else pd.Timedelta(value)
+            value = np.array([value.to_numpy()]).astype(dtype).view(np.int64)[0]
+        return raw.view(np.int64), value, lambda k: k == np.iinfo(np.int64).min
+    return raw, value, pd.isna
+
+def seek_sorted(values: pd.Series, order: np.ndarray, ascending: bool, value, position: int) -> int:
+    """Index of the first entry of ``order`` sorting after the row (``value``, ``position``).
+
+    ``order`` holds positions into ``values`` as ``sort_positions`` orders
+    them; ``value`` is None for a missing value. A binary search over it, so
+    resuming a sorted listing costs no more than a few row lookups. Raises
+    ValueError when ``value`` can't be compared with the column.
+    """
+    try:
+        keys, target, is_missing = _seek_keys(values, value)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{value!r} is not a value of column {values.name!r}") from e
+    target_missing = value is None
+
+    def at_or_before(pos: int) -> bool:
+        key = keys[pos]
+        missing = bool(is_missing(key))
+        if missing != target_missing:
+            return not missing
+        if not missing and key != target:
+            return bool(key < target) if ascending else bool(key > target)
+        return pos <= position
+
+    lo, hi = 0, len(order)
+    try:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if at_or_before(order[mid]):
+                lo = mid + 1
+            else:
+                hi = mid
+    except TypeError as e:
+        raise ValueError(f"{value!r} can't be compared with column {values.name!r}") from e
+    return lo
+
 
-    if filters.get('claim_status') and filters['claim_status'] != 'All':
-        if 'Claim Status' in result.columns:
-            result = result[result['Claim Status'] == filters['claim_status']]
+class FilteredView:
+    """A lazy row selection over a DataFrame.
 
-    return result
+    Columns are gathered only when an aggregation touches them, and nothing
+    is copied when no filter is active. Supports the read-only subset of the
+    DataFrame API the metrics use; call ``frame()`` for a real DataFrame.
+    """
+
+    def __init__(self, df: pd.DataFrame, positions: Optional[np.ndarray] = None):
+        self.df = df
+        self.positions = positions
+        self._gathered: dict[str, pd.Series] = {}
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.df.columns
+
+    def __len__(self) -> int:
+        return len(self.df) if self.positions is None else len(self.positions)
+
+    def __getitem__(self, key):
+        if isinstance(key, list):
+            return self.frame(key)
+        if key not in self._gathered:
+            s = self.df[key]
+            self._gathered[key] = s if self.positions is None else s.take(self.positions)
+        return self._gathered[key]
+
+    def frame(self, columns: list[str] = None) -> pd.DataFrame:
+        """Materialize the selected rows (optionally only some columns)."""
+        df = self.df if columns is None else self.df[list(dict.fromkeys(columns))]
+        # Shallow: callers read the frame or add columns to it, never write into the table's
+        return df.copy(deep=False) if self.positions is None else df.take(self.positions)
+
+    def groupby(self, by, **kwargs) -> '_ViewGroupBy':
+        return _ViewGroupBy(self, by, kwargs)
+
+    def sort_values(self, by: str, ascending: bool = True) -> 'FilteredView':
+        order = self[by].reset_index(drop=True).sort_values(ascending=ascending).index.to_numpy()
+        return FilteredView(self.df, self._base()[order])
+
+    def slice(self, start: int, stop: int) -> 'FilteredView':
+        return FilteredView(self.df, self._base()[start:stop])
+
+    def head(self, n: int) -> 'FilteredView':
+        return self.slice(0, n)
+
+    def _base(self) -> np.ndarray:
+        return np.arange(len(self.df)) if self.positions is None else self.positions
+
+
+class _ViewGroupBy:
+    """Defers a groupby until the aggregation names the columns it needs."""
+
+    def __init__(self, view: FilteredView, by, kwargs: dict):
+        self.view = view
+        self.keys = list(by) if isinstance(by, (list, tuple)) else [by]
+        self.by = by
+        self.kwargs = kwargs
+
+    def agg(self, **named):
+        columns = self.keys + [spec[0] for spec in named.values()]
+        return self.view.frame(columns).groupby(self.by, **self.kwargs).agg(**named)
+
+    def __getitem__(self, col):
+        return self.view.frame(self.keys + [col]).groupby(self.by, **self.kwargs)[col]
+
+
+def filter_view(df: pd.DataFrame, filters: dict) -> FilteredView:
+    """Filter without copying: a lazy view over the matching rows."""
+    return FilteredView(df, filter_rows(df, filters))
+
+def _cube(df: pd.DataFrame):
+    from backend.core.indexes import get_index
+
+    index = get_index(df)
+    return index.cube if index is not None else None
+
+def aggregate(df: pd.DataFrame, filters: dict, by, **named) -> pd.DataFrame:
+    """``filter_view(df, filters).groupby(by, observed=True).agg(**named)``.
+
+    Answered from the table's aggregate cube (see ``backend.core.cube``) when
+    the filters and aggregations allow it, otherwise from the filtered rows.
+    """
+    cube = _cube(df)
+    if cube is not None:
+        result = cube.aggregate(df, filters, by, named, lambda: filter_rows(df, filters))
+        if result is not None:
+            return result
+    return filter_view(df, filters).groupby(by, observed=True).agg(**named)
+
+def totals(df: pd.DataFrame, filters: dict, **named) -> dict:
+    """Ungrouped ``name=(column, func)`` aggregations over the filtered rows.
+
+    ``func`` is one of sum, count, mean, size or nunique; uses the cube like ``aggregate``.
+    """
+    cube = _cube(df)
+    if cube is not None:
+        result = cube.totals(df, filters, named, lambda: filter_rows(df, filters))
+        if result is not None:
+            return result
+    view = filter_view(df, filters)
+    return {name: len(view) if func == 'size' else getattr(view[col], func)()
+            for name, (col, func) in named.items()}
+
+def fill_missing(df: pd.DataFrame, value: Any = 0) -> pd.DataFrame:
+    """``df.fillna(value)`` skipping categorical columns (group keys never miss, and can't take ``value``)."""
+    return df.fillna({col: value for col in df.columns if not isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Apply common filters to a dataframe."""
+    return filter_view(df, filters).frame()
@@ -0,0 +1,154 @@
+"""
+Bounded worker pools for the blocking work behind API requests.
+
+Request handlers are coroutines, but the analytics under them are
+synchronous pandas code and the AI calls block on the network; run on the
+event loop, one slow request stalls every other. ``WorkerPool.run`` hands
+such calls to a fixed number of threads instead and awaits the result.
+
+Requests beyond the pool's threads wait in its queue; once ``max_queued``
+are waiting, further calls raise ``PoolSaturated`` (served as 503) rather
+than letting the backlog grow. Each pool counts queued and running calls,
+its peak queue depth and wait/run times for ``/api/workers``.
+
+The loaded tables are shared by every thread, so pools that touch them take
+``data_lock``: any number of reads at a time, edits and reloads alone.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+WORKER_THREADS = int(os.environ.get('CLARITY_WORKER_THREADS', '4'))
+AI_THREADS = int(os.environ.get('CLARITY_AI_THREADS', '4'))
+MAX_QUEUED = int(os.environ.get('CLARITY_MAX_QUEUED', '64'))
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when a pool's queue is full."""
+
+
+class RWLock:
+    """Readers-writer lock; a waiting writer holds off new readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+# Guards the DataManager's tables, indexes and change log
+data_lock = RWLock()
+
+
+class WorkerPool:
+    """A fixed set of threads running blocking calls for coroutines.
+
+    With ``threads=0`` calls run inline on the event loop, as they did before
+    pools existed (useful for comparisons); they are still counted.
+    """
+
+    def __init__(self, name: str, threads: int = WORKER_THREADS, max_queued: int = MAX_QUEUED,
+                 lock: Optional[RWLock] = None):
+        self.name = name
+        self.threads = threads
+        self.max_queued = max_queued
+        self.lock = lock
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix=f'clarity-{name}') if threads > 0 else None
+        self._stats_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, write: bool = False) -> Any:
+        """Run ``fn(*args)`` on the pool (under the data lock, exclusively if ``write``)."""
+        with self._stats_lock:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.name} pool is saturated ({self.queued} requests queued)")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        submitted = time.perf_counter()
+        if self._executor is None:
+            return self._call(fn, args, write, submitted)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args, write, submitted)
+
+    def _call(self, fn, args, write: bool, submitted: float):
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.queued -= 1
+            self.running += 1
+            self._wait_seconds += started - submitted
+        ok = False
+        try:
+            if self.lock is None:
+                result = fn(*args)
+            else:
+                with (self.lock.write() if write else self.lock.read()):
+                    result = fn(*args)
+            ok = True
+            return result
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+                self._run_seconds += time.perf_counter() - started
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            done = self.completed + self.failed
+            return {
+                "threads": self.threads,
+                "maxQueued": self.max_queued,
+                "running": self.running,
+                "queued": self.queued,
+                "peakQueued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avgWaitMs": round(self._wait_seconds / done * 1000, 2) if done else 0.0,
+                "avgRunMs": round(self._run_seconds / done * 1000, 2) if done else 0.0,
+            }
@@ -3,13 +3,17 @@ Clarity BI — FastAPI Backend
 Real-time data processing, analytics, inline editing, and Gemini AI for Sales & Claims data.
 """
 
-from fastapi import FastAPI, UploadFile, File, Query, HTTPException
+from fastapi import FastAPI, UploadFile, File, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from contextvars import ContextVar
 from typing import Optional, Any
 import os
 import io
+import time
+import uuid
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -18,10 +22,14 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 # Import core modules
 from backend.core.data_manager import DataManager
+from backend.core.ingest import IngestProgress
+from backend.core.serialize import EncodedJSONResponse, JSONBytesResponse, as_columnar, dumps, join_object
+from backend.core.shared import SHARED_DATA, SharedDataset
+from backend.core.workers import AI_THREADS, PoolSaturated, WorkerPool, data_lock
 from backend.ai.gemini import GeminiService
 from backend.metrics import sales, claims, kpis, budget, predictive
 
-app = FastAPI(title="Clarity BI API", version="2.0.0")
+app = FastAPI(title="Clarity BI API", version="2.0.0", default_response_class=JSONBytesResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,11 +37,103 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Version", "X-Data-Run"],
 )
 
 # Global instances
 data_manager = DataManager()
 gemini = GeminiService()
+upload_progress = IngestProgress()
+# Set when several server processes share one dataset (see backend.core.shared)
+shared = SharedDataset() if SHARED_DATA else None
+# Data versions count within this process, or within the processes sharing a dataset
+DATA_RUN = shared.run if shared is not None else uuid.uuid4().hex
+# Blocking work runs here, never on the event loop; analytics share the data lock
+analytics = WorkerPool('analytics', lock=data_lock)
+ai = WorkerPool('ai', threads=AI_THREADS)
+
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated(request, exc: PoolSaturated):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+# ─── Data versions ─────────────────────────────────────────
+
+# Per request: the data version the handler's reads and writes saw
+_seen_version: ContextVar[Optional[dict]] = ContextVar('seen_version', default=None)
+
+
+async def _run(fn, *args, write: bool = False):
+    """Run ``fn`` on the analytics pool, noting the data version it ran against.
+
+    Reads hold the data lock shared and writes hold it exclusively, so the
+    version read under the lock is exactly the one the result reflects. With
+    shared data, reads first catch up with other processes' edits and writes
+    go through the shared writer.
+    """
+    if shared is not None and write:
+        fn, args = shared.write, (data_manager, fn) + args
+    else:
+        await _catch_up()
+
+    def call():
+        return fn(*args), data_manager.version
+
+    result, version = await analytics.run(call, write=write)
+    seen = _seen_version.get()
+    if seen is not None:
+        seen['version'] = version
+    return result
+
+
+async def _respond(fn, *args, fmt: str = 'records') -> JSONBytesResponse:
+    """``_run`` a read and encode its result directly, skipping FastAPI's ``jsonable_encoder``.
+
+    ``fmt='columnar'`` sends record lists as one array per field (``serialize.as_columnar``).
+    """
+    result = await _run(fn, *args)
+    return JSONBytesResponse(as_columnar(result) if fmt == 'columnar' else result)
+
+
+async def _read_now(fn, *args):
+    """Run a cheap read under the shared data lock, off the event loop but not queued on the pool.
+
+    Status checks stay responsive while analytics are backed up, yet never
+    see tables that an edit or reload is swapping.
+    """
+    await _catch_up()
+
+    def call():
+        with data_lock.read():
+            return fn(*args), data_manager.version
+
+    result, version = await run_in_threadpool(call)
+    seen = _seen_version.get()
+    if seen is not None:
+        seen['version'] = version
+    return result
+
+
+async def _catch_up():
+    """Attach the newest shared generation if another process published one."""
+    if shared is not None and shared.stale():
+        await analytics.run(shared.sync, data_manager, write=True)
+
+
+@app.middleware("http")
+async def data_version_header(request: Request, call_next):
+    """Tag every response with ``X-Data-Version`` so clients can drop results of older data.
+
+    ``X-Data-Run`` names what the version counts in; versions of different runs
+    (another process, or a restarted one) aren't comparable.
+    """
+    seen = {}
+    _seen_version.set(seen)
+    response = await call_next(request)
+    response.headers["X-Data-Version"] = str(seen.get('version', data_manager.version))
+    response.headers["X-Data-Run"] = DATA_RUN
+    return response
 
 
 # ─── Auto-load data on startup ──────────────────────────────
@@ -52,14 +152,22 @@ async def startup():
     
     excel_path = next((p for p in candidates if os.path.exists(p)), None)
     
-    if os.path.exists(excel_path):
-        try:
-            data_manager.load_excel(file_path=excel_path)
-            print(f"Auto-loaded {excel_path}")
-            print(f"   Sales: {len(data_manager.sales_df)} rows")
-            print(f"   Claims: {len(data_manager.claims_df)} rows")
-        except Exception as e:
-            print(f"Failed to auto-load: {e}")
+    load = (lambda: data_manager.load_excel(file_path=excel_path)) if excel_path else None
+    started = time.perf_counter()
+    try:
+        if shared is not None:
+            # One worker loads and publishes a generation; the others attach to it
+            shared.load(data_manager, load)
+        elif load is not None:
+            load()
+    except Exception as e:
+        print(f"Failed to auto-load: {e}")
+        return
+    if data_manager.sales_df is not None:
+        source = data_manager.load_source + (f", shared {shared.generation}" if shared is not None else '')
+        print(f"Auto-loaded {excel_path} (from {source}) in {time.perf_counter() - started:.2f}s")
+        print(f"   Sales: {len(data_manager.sales_df)} rows")
+        print(f"   Claims: {len(data_manager.claims_df)} rows")
 
 
 # ─── Models ────────────────────────────────────────────────
@@ -83,20 +191,42 @@ class ChatMessage(BaseModel):
 # ─── Upload ────────────────────────────────────────────────
 
 @app.post("/api/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload an Excel file and process both sheets."""
+async def upload_file(file: UploadFile = File(...), claims_file: Optional[UploadFile] = File(None)):
+    """Upload an Excel file and process both sheets.
+
+    Alternatively upload the Sales table as ``file`` and the Claims table as
+    ``claims_file``, each as CSV, Parquet or Arrow. The upload is already
+    spooled to a temporary file; it is parsed on a worker thread (progress at
+    /api/upload/status) while the current data keeps serving requests, then
+    swapped in at once.
+    """
+    if upload_progress.busy:
+        raise HTTPException(status_code=409, detail="Another upload is still being processed")
+    upload_progress.start(file.filename, file.size)
     try:
-        contents = await file.read()
-        data_manager.load_excel(file_bytes=contents)
-        return {
-            "success": True,
-            "fileName": file.filename,
-            "salesRows": len(data_manager.sales_df),
-            "claimsRows": len(data_manager.claims_df),
-            "filterOptions": data_manager.get_filter_options(),
-        }
+        staged = await run_in_threadpool(
+            DataManager.from_upload, file.file, upload_progress,
+            claims_file.file if claims_file else None,
+            (file.filename or '', (claims_file.filename or '') if claims_file else ''),
+        )
     except Exception as e:
+        upload_progress.finish(error=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    await _run(data_manager.adopt, staged, write=True)
+    upload_progress.finish()
+    return await _respond(lambda: {
+        "success": True,
+        "fileName": file.filename,
+        "salesRows": len(data_manager.sales_df),
+        "claimsRows": len(data_manager.claims_df),
+        "filterOptions": data_manager.get_filter_options(),
+    })
+
+
+@app.get("/api/upload/status")
+async def get_upload_status():
+    """Progress of the current or last upload."""
+    return JSONBytesResponse(upload_progress.as_dict())
 
 
 # ─── Health & Status ───────────────────────────────────────
@@ -104,16 +234,11 @@ async def upload_file(file: UploadFile = File(...)):
 @app.get("/api/status")
 async def get_status():
     """Check if data is loaded and AI is available."""
-    max_date = None
-    if data_manager.sales_df is not None:
-        try:
-            date_col = 'Policy Sold Date' if 'Policy Sold Date' in data_manager.sales_df.columns else None
-            if date_col:
-                dates = pd.to_datetime(data_manager.sales_df[date_col], errors='coerce').dropna()
-                if not dates.empty:
-                    max_date = dates.max().strftime('%Y-%m-%d')
-        except Exception:
-            pass
+    return JSONBytesResponse(await _read_now(_status))
+
+def _status() -> dict:
+    date_range = data_manager.get_date_range()
+    max_date = date_range[1].strftime('%Y-%m-%d') if date_range else None
     return {
         "dataLoaded": data_manager.sales_df is not None,
         "salesRows": len(data_manager.sales_df) if data_manager.sales_df is not None else 0,
@@ -121,8 +246,31 @@ async def get_status():
         "aiAvailable": gemini.is_available,
         "pendingChanges": len(data_manager.change_log),
         "maxDate": max_date,
+        "dataVersion": data_manager.version,
     }
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Result cache size, budget and hit/miss/eviction counters."""
+    return JSONBytesResponse(await _read_now(data_manager.cache_stats))
+
+
+@app.get("/api/memory")
+async def get_memory():
+    """Per-table and per-column memory footprint of the loaded data."""
+    return await _respond(data_manager.memory_usage)
+
+
+@app.get("/api/workers")
+async def get_worker_stats():
+    """Thread, queue-depth and latency counters of the worker pools."""
+    await _catch_up()
+    return JSONBytesResponse({
+        "analytics": analytics.stats(),
+        "ai": ai.stats(),
+        "process": {"pid": os.getpid(), "sharedGeneration": shared.generation if shared is not None else None},
+    })
+
 
 # ─── Filters & Summary ─────────────────────────────────────
 
@@ -135,6 +283,78 @@ def _parse_filters(dealer, product, year, month, make, date_from, date_to, searc
     # Filter out None and 'All'
     return {k: v for k, v in filters.items() if v is not None and v != 'All' and v != ''}
 
+# ?format=columnar on chart endpoints: record lists as {columns, data: {column: [values]}}
+FORMAT_QUERY = Query('records', alias='format', pattern='^(records|columnar)$')
+
+# Filtered metrics by name, with the columns each one reads per table. Results
+# are cached per filter set; an edit only invalidates metrics reading its column.
+METRICS = {
+    'summary': (
+        lambda f: kpis.get_summary(data_manager.sales_df, data_manager.claims_df, data_manager.merged_df, f),
+        {'sales': ['Gross Premium', 'Risk Premium', 'Make', 'Dealer'],
+         'claims': ['Total Auth Amount'], 'merged': ['has_claim']},
+    ),
+    'salesMonthly': (
+        lambda f: sales.get_sales_monthly(data_manager.sales_df, f),
+        {'sales': ['Year', 'Month', 'Gross Premium', 'Risk Premium', 'Policy No']},
+    ),
+    'salesDealers': (
+        lambda f: sales.get_sales_dealers(data_manager.sales_df, data_manager.merged_df, f),
+        {'sales': ['Dealer', 'Gross Premium', 'Risk Premium', 'Policy No'],
+         'merged': ['Dealer', 'has_claim', 'total_claim_amount']},
+    ),
+    'salesProducts': (
+        lambda f: sales.get_sales_products(data_manager.sales_df, f),
+        {'sales': ['Product', 'Coverage', 'Gross Premium', 'Risk Premium', 'Policy No']},
+    ),
+    'salesVehicles': (
+        lambda f: sales.get_sales_vehicles(data_manager.sales_df, f),
+        {'sales': ['Make', 'Gross Premium', 'Policy No']},
+    ),
+    'claimStatuses': (
+        lambda f: claims.get_claims_status(data_manager.claims_df, f),
+        {'claims': ['Claim Status', 'Policy No', 'Total Auth Amount']},
+    ),
+    'claimParts': (
+        lambda f: claims.get_claims_parts(data_manager.claims_df, f),
+        {'claims': ['Part Type', 'Policy No', 'Total Auth Amount']},
+    ),
+    'claimTrends': (
+        lambda f: claims.get_claims_trends(data_manager.claims_df, f),
+        {'claims': ['Year', 'Month', 'Policy No', 'Total Auth Amount', 'Labor', 'Parts']},
+    ),
+    'correlations': (
+        lambda f: kpis.get_correlations(data_manager.merged_df, f),
+        {'merged': ['Dealer', 'Product', 'Coverage', 'Make', 'Year', 'Gross Premium',
+                    'has_claim', 'total_claim_amount']},
+    ),
+    'budget': (
+        lambda f: budget.get_budget_vs_achieved(data_manager.sales_df, f),
+        {'sales': ['Gross Premium']},
+    ),
+    'prediction': (
+        lambda f: predictive.predict_loss_ratio(data_manager.sales_df, data_manager.claims_df, f),
+        {'sales': ['Year', 'Month', 'Gross Premium'], 'claims': ['Year', 'Month', 'Total Auth Amount']},
+    ),
+}
+
+def _reads(*names: str) -> dict:
+    """Union of the columns several metrics read."""
+    reads = {}
+    for name in names:
+        for table, columns in METRICS[name][1].items():
+            reads[table] = sorted(set(reads.get(table, [])) | set(columns))
+    return reads
+
+def _metric(name: str, filters: dict):
+    compute, reads = METRICS[name]
+    return data_manager.cached(name, filters, lambda: compute(filters), reads)
+
+def _recent_claims(filters: dict, limit: int = 50):
+    return data_manager.cached(f'recentClaims:{limit}', filters,
+                               lambda: claims.get_claims_recent(data_manager.claims_df, filters, limit),
+                               {'claims': '*'})
+
 @app.get("/api/summary")
 async def get_summary(
     dealer: str = Query(None), product: str = Query(None),
@@ -144,12 +364,12 @@ async def get_summary(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return kpis.get_summary(data_manager.sales_df, data_manager.claims_df, data_manager.merged_df, filters)
+    return await _respond(_metric, 'summary', filters)
 
 @app.get("/api/filters")
 async def get_filter_options():
     """Get available filter values."""
-    return data_manager.get_filter_options()
+    return await _respond(data_manager.get_filter_options)
 
 
 # ─── Sales Metrics ─────────────────────────────────────────
@@ -161,9 +381,10 @@ async def sales_monthly(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return sales.get_sales_monthly(data_manager.sales_df, filters)
+    return await _respond(_metric, 'salesMonthly', filters, fmt=fmt)
 
 @app.get("/api/sales/dealers")
 async def sales_dealers(
@@ -172,9 +393,10 @@ async def sales_dealers(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return sales.get_sales_dealers(data_manager.sales_df, data_manager.merged_df, filters)
+    return await _respond(_metric, 'salesDealers', filters, fmt=fmt)
 
 @app.get("/api/sales/products")
 async def sales_products(
@@ -183,9 +405,10 @@ async def sales_products(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return sales.get_sales_products(data_manager.sales_df, filters)
+    return await _respond(_metric, 'salesProducts', filters, fmt=fmt)
 
 @app.get("/api/sales/vehicles")
 async def sales_vehicles(
@@ -194,9 +417,10 @@ async def sales_vehicles(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return sales.get_sales_vehicles(data_manager.sales_df, filters)
+    return await _respond(_metric, 'salesVehicles', filters, fmt=fmt)
 
 
 # ─── Claims Metrics ────────────────────────────────────────
@@ -208,9 +432,10 @@ async def claims_status(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return claims.get_claims_status(data_manager.claims_df, filters)
+    return await _respond(_metric, 'claimStatuses', filters, fmt=fmt)
 
 @app.get("/api/claims/parts")
 async def claims_parts(
@@ -219,9 +444,10 @@ async def claims_parts(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return claims.get_claims_parts(data_manager.claims_df, filters)
+    return await _respond(_metric, 'claimParts', filters, fmt=fmt)
 
 @app.get("/api/claims/trends")
 async def claims_trends(
@@ -230,9 +456,10 @@ async def claims_trends(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return claims.get_claims_trends(data_manager.claims_df, filters)
+    return await _respond(_metric, 'claimTrends', filters, fmt=fmt)
 
 @app.get("/api/claims/recent")
 async def claims_recent(
@@ -244,7 +471,7 @@ async def claims_recent(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return claims.get_claims_recent(data_manager.claims_df, filters, limit)
+    return await _respond(_recent_claims, filters, limit)
 
 
 # ─── New Features ──────────────────────────────────────────
@@ -258,7 +485,7 @@ async def get_budget(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return budget.get_budget_vs_achieved(data_manager.sales_df, filters)
+    return await _respond(_metric, 'budget', filters)
 
 @app.get("/api/predict")
 async def get_prediction(
@@ -269,7 +496,7 @@ async def get_prediction(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return predictive.predict_loss_ratio(data_manager.sales_df, data_manager.claims_df, filters)
+    return await _respond(_metric, 'prediction', filters)
 
 
 # ─── Data Validation ───────────────────────────────────────
@@ -277,6 +504,9 @@ async def get_prediction(
 @app.get("/api/validate")
 async def validate_data():
     """Validate data structure and quality."""
+    return await _respond(_validate_data)
+
+def _validate_data() -> dict:
     issues = []
     if data_manager.sales_df is None:
         return {"status": "error", "issues": [{"type": "missing_data", "message": "Sales data not loaded"}]}
@@ -299,9 +529,10 @@ async def correlations(
     make: str = Query(None), date_from: str = Query(None),
     date_to: str = Query(None), search: str = Query(None),
     claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return kpis.get_correlations(data_manager.merged_df, filters)
+    return await _respond(_metric, 'correlations', filters, fmt=fmt)
 
 @app.get("/api/insights")
 async def get_insights(
@@ -312,8 +543,19 @@ async def get_insights(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    
-    summary = kpis.get_summary(data_manager.sales_df, data_manager.claims_df, data_manager.merged_df, filters)
+    return await _respond(_insights, filters)
+
+def _insights(filters: dict) -> list[dict]:
+    def compute():
+        try:
+            prediction = _metric('prediction', filters)
+        except Exception:
+            prediction = None
+        return _build_insights(_metric('summary', filters), prediction)
+    return data_manager.cached('insights', filters, compute, _reads('summary', 'prediction'))
+
+def _build_insights(summary: dict, prediction: Optional[dict]) -> list[dict]:
+    """Turn the KPI summary and loss-ratio forecast into insight cards."""
     insights_list = []
     
     if summary:
@@ -367,24 +609,85 @@ async def get_insights(
             })
 
     # Predictive Trend insight
-    try:
-        prediction = predictive.predict_loss_ratio(data_manager.sales_df, data_manager.claims_df, filters)
-        if prediction and 'historicalSlope' in prediction:
-            slope = prediction['historicalSlope']
-            direction = "increasing" if slope > 0 else "decreasing"
-            insights_list.append({
-                "type": "forecast",
-                "title": "Loss Ratio Forecast",
-                "description": f"Historical trend shows loss ratio is {direction}. Plan accordingly.",
-                "metric": f"{'+' if slope > 0 else ''}{slope:.1f}% /mo",
-                "trend": "down" if slope > 0 else "up"
-            })
-    except Exception:
-        pass
+    if prediction and 'historicalSlope' in prediction:
+        slope = prediction['historicalSlope']
+        direction = "increasing" if slope > 0 else "decreasing"
+        insights_list.append({
+            "type": "forecast",
+            "title": "Loss Ratio Forecast",
+            "description": f"Historical trend shows loss ratio is {direction}. Plan accordingly.",
+            "metric": f"{'+' if slope > 0 else ''}{slope:.1f}% /mo",
+            "trend": "down" if slope > 0 else "up"
+        })
 
     return insights_list
 
 
+# ─── Batched Dashboard ─────────────────────────────────────
+
+# Widgets fetched on every dashboard refresh, in response order
+DASHBOARD_WIDGETS = [
+    'summary', 'filterOptions', 'salesMonthly', 'salesDealers', 'salesProducts',
+    'salesVehicles', 'claimStatuses', 'claimParts', 'claimTrends', 'recentClaims',
+    'correlations', 'insights', 'validation',
+]
+# Also available on request via ?widgets=
+OPTIONAL_WIDGETS = ['budget', 'prediction']
+# Chart series reshaped by ?format=columnar
+CHART_WIDGETS = {
+    'salesMonthly', 'salesDealers', 'salesProducts', 'salesVehicles',
+    'claimStatuses', 'claimParts', 'claimTrends', 'correlations',
+}
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    widgets: str = Query(None, description="Comma-separated widget names; defaults to the dashboard set"),
+    dealer: str = Query(None), product: str = Query(None),
+    year: str = Query(None), month: str = Query(None),
+    make: str = Query(None), date_from: str = Query(None),
+    date_to: str = Query(None), search: str = Query(None),
+    claim_status: str = Query(None),
+    fmt: str = FORMAT_QUERY,
+):
+    """Every dashboard widget for one filter set in a single response.
+
+    Sales, claims and merged rows are selected once and shared by all widgets;
+    a widget that fails is reported under ``errors`` instead of failing the batch.
+    With ``format=columnar`` only the chart widgets (``CHART_WIDGETS``) are reshaped.
+    """
+    filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
+    wanted = [w.strip() for w in widgets.split(',') if w.strip()] if widgets else DASHBOARD_WIDGETS
+    unknown = [w for w in wanted if w not in DASHBOARD_WIDGETS + OPTIONAL_WIDGETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown widgets: {', '.join(unknown)}")
+    return EncodedJSONResponse(await _run(_build_dashboard, filters, wanted, fmt))
+
+def _build_dashboard(filters: dict, wanted: list[str], fmt: str = 'records') -> bytes:
+    """The dashboard response body, assembled from each widget's encoded JSON."""
+    builders = {
+        'filterOptions': data_manager.get_filter_options,
+        'recentClaims': lambda: _recent_claims(filters),
+        'insights': lambda: _insights(filters),
+        'validation': _validate_data,
+    }
+
+    def widget(name):
+        return builders[name]() if name in builders else _metric(name, filters)
+
+    members, errors = {}, {}
+    for name in wanted:
+        try:
+            value = widget(name)
+            if fmt == 'columnar' and name in CHART_WIDGETS:
+                value = as_columnar(value)
+            # Encoded widget by widget, so a value the encoder can't handle fails only its widget
+            members[name] = dumps(value)
+        except Exception as e:
+            errors[name] = str(e)
+    members['errors'] = dumps(errors)
+    return join_object(members)
+
+
 # ─── Data Management ───────────────────────────────────────
 
 @app.get("/api/data/{table}")
@@ -401,33 +704,79 @@ async def get_data_table(
     claim_status: str = Query(None),
 ):
     filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
-    return data_manager.get_raw_data(table, page, limit, filters, sort_by, sort_dir) 
+    return await _respond(data_manager.get_raw_data, table, page, limit, filters, sort_by, sort_dir)
+
+@app.get("/api/data/{table}/scroll")
+async def scroll_data_table(
+    table: str,
+    cursor: str = Query(None),
+    limit: int = Query(100, ge=10, le=500),
+    sort_by: str = Query(None),
+    sort_dir: str = Query('asc'),
+    dealer: str = Query(None), product: str = Query(None),
+    year: str = Query(None), month: str = Query(None),
+    make: str = Query(None), date_from: str = Query(None),
+    date_to: str = Query(None), search: str = Query(None),
+    claim_status: str = Query(None),
+):
+    """Keyset pagination: pass the previous page's ``nextCursor`` for the next page."""
+    filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
+    try:
+        return await _respond(data_manager.scroll_raw_data, table, cursor, limit, filters, sort_by, sort_dir)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/data/{table}/count")
+async def count_data_table(
+    table: str,
+    dealer: str = Query(None), product: str = Query(None),
+    year: str = Query(None), month: str = Query(None),
+    make: str = Query(None), date_from: str = Query(None),
+    date_to: str = Query(None), search: str = Query(None),
+    claim_status: str = Query(None),
+):
+    """Matching row count for the scroll listing, cached per filter set."""
+    filters = _parse_filters(dealer, product, year, month, make, date_from, date_to, search, claim_status)
+    return await _respond(data_manager.count_raw_data, table, filters)
+
+@app.get("/api/data/{table}/rows/{row_id}")
+async def get_data_row(table: str, row_id: int):
+    """Fetch a single row by its _row_id."""
+    row = await _run(data_manager.get_row, table, row_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Row {row_id} not found in {table}")
+    return JSONBytesResponse(row)
 
 @app.put("/api/data/update")
 async def update_cell(update: CellUpdate):
-    result = data_manager.update_cell(update.table, update.row_id, update.column, update.new_value)
+    result = await _run(data_manager.update_cell, update.table, update.row_id, update.column,
+                                 update.new_value, write=True)
     if not result['success']:
         raise HTTPException(status_code=400, detail=result['error'])
-    return result
+    return JSONBytesResponse(result)
 
 @app.put("/api/data/bulk-update")
 async def bulk_update(payload: BulkUpdate):
-    result = data_manager.bulk_update(payload.table, payload.updates)
+    result = await _run(data_manager.bulk_update, payload.table, payload.updates, write=True)
     if not result['success']:
-        raise HTTPException(status_code=400, detail="Some updates failed")
-    return result
+        # The batch is all-or-nothing: report every update's outcome
+        raise HTTPException(status_code=400, detail={
+            "message": "Some updates failed; no changes were applied",
+            "results": result['results'],
+        })
+    return JSONBytesResponse(result)
 
 @app.post("/api/data/reset")
 async def reset_data():
-    return data_manager.reset_data()
+    return JSONBytesResponse(await _run(data_manager.reset_data, write=True))
 
 @app.get("/api/data/changes")
 async def get_changes():
-    return data_manager.change_log
+    return await _respond(lambda: list(data_manager.change_log))
 
 @app.get("/api/export/{table}")
 async def export_data(table: str):
-    data = data_manager.export_data(table)
+    data = await _run(data_manager.export_data, table)
     if not data:
         raise HTTPException(status_code=404, detail="No data to export")
 
@@ -442,20 +791,20 @@ async def export_data(table: str):
 
 @app.post("/api/chat")
 async def chat(payload: ChatMessage):
-    data_context = data_manager.get_data_summary_for_ai(payload.filters)
-    result = gemini.chat(payload.message, data_context, payload.history or [])
+    data_context = await _run(data_manager.get_data_summary_for_ai, payload.filters)
+    result = await ai.run(gemini.chat, payload.message, data_context, payload.history or [])
     # General suggestions for the empty state panel (up to 5)
-    general_suggestions = gemini.get_suggestions(data_context) if gemini.is_available else []
+    general_suggestions = await ai.run(gemini.get_suggestions, data_context) if gemini.is_available else []
     # Widget suggestions based on message keywords
     widget_suggestions = _get_widget_suggestions(payload.message)
-    return {
+    return JSONBytesResponse({
         "response": result.get('text', str(result)) if isinstance(result, dict) else str(result),
         "actions": result.get('actions') if isinstance(result, dict) else None,
         "suggestions": general_suggestions,
         "nextSuggestions": result.get('next_suggestions', []),
         "widgetSuggestions": widget_suggestions,
         "aiAvailable": gemini.is_available,
-    }
+    })
 
 
 def _get_widget_suggestions(message: str) -> list[dict]:
@@ -483,11 +832,24 @@ def _get_widget_suggestions(message: str) -> list[dict]:
 @app.get("/api/chat/suggestions")
 async def chat_suggestions():
     if not gemini.is_available:
-        return {"suggestions": []}
-    data_context = data_manager.get_data_summary_for_ai()
-    return {"suggestions": gemini.get_suggestions(data_context)}
+        return JSONBytesResponse({"suggestions": []})
+    data_context = await _run(data_manager.get_data_summary_for_ai)
+    return JSONBytesResponse({"suggestions": await ai.run(gemini.get_suggestions, data_context)})
 
 
-if __name__ == "__main__":
+def serve(host: str = "0.0.0.0", port: int = 8000):
+    """Run the API; ``CLARITY_WORKERS`` > 1 starts that many processes sharing one dataset."""
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    workers = int(os.environ.get('CLARITY_WORKERS', '1'))
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+    # Read by the worker processes, which import the app afresh
+    os.environ['CLARITY_SHARED_DATA'] = '1'
+    os.environ.setdefault('CLARITY_SHARED_RUN', uuid.uuid4().hex)
+    uvicorn.run("backend.main:app", host=host, port=port, workers=workers)
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,5 +1,5 @@
 import pandas as pd
-from backend.core.utils import apply_filters
+from backend.core.utils import totals
 
 def get_budget_vs_achieved(sales_df: pd.DataFrame, filters: dict = None) -> dict:
     """Calculate Budget vs Achieved metrics."""
@@ -7,11 +7,14 @@ def get_budget_vs_achieved(sales_df: pd.DataFrame, filters: dict = None) -> dict
         return {}
 
     filters = filters or {}
-    df = apply_filters(sales_df, filters)
+    named = {'policies': ('_row_id', 'size')}
+    if 'Gross Premium' in sales_df.columns:
+        named['revenue'] = ('Gross Premium', 'sum')
+    actuals = totals(sales_df, filters, **named)
 
     # Actuals
-    revenue_actual = float(df['Gross Premium'].sum()) if 'Gross Premium' in df.columns else 0
-    policies_actual = len(df)
+    revenue_actual = float(actuals.get('revenue', 0))
+    policies_actual = int(actuals['policies'])
 
     # Mock Budget Generation (Target = Actual * 1.15 to simulate a stretch goal)
     # In a real app, this would come from a 'Budget' sheet or DB table
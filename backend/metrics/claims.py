@@ -1,5 +1,5 @@
 import pandas as pd
-from backend.core.utils import find_column, apply_filters
+from backend.core.utils import aggregate, fill_missing, find_column, filter_view
 
 def get_claims_status(df: pd.DataFrame, filters: dict = None) -> list[dict]:
     """Claim status distribution."""
@@ -7,14 +7,14 @@ def get_claims_status(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
 
-    if 'Claim Status' not in df_filtered.columns:
+    if 'Claim Status' not in df.columns:
         return []
 
-    grouped = df_filtered.groupby('Claim Status').agg(
-        count=('Policy No', 'count') if 'Policy No' in df_filtered.columns else ('Claim Status', 'count'),
-        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df_filtered.columns else ('Claim Status', 'count'),
+    grouped = aggregate(
+        df, filters, 'Claim Status',
+        count=('Policy No', 'count') if 'Policy No' in df.columns else ('Claim Status', 'count'),
+        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df.columns else ('Claim Status', 'count'),
     ).reset_index()
     grouped.columns = ['status', 'count', 'totalAmount']
 
@@ -29,19 +29,19 @@ def get_claims_parts(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
 
-    if 'Part Type' not in df_filtered.columns:
+    if 'Part Type' not in df.columns:
         return []
 
-    grouped = df_filtered.groupby('Part Type').agg(
-        count=('Policy No', 'count') if 'Policy No' in df_filtered.columns else ('Part Type', 'count'),
-        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df_filtered.columns else ('Part Type', 'count'),
-        avgCost=('Total Auth Amount', 'mean') if 'Total Auth Amount' in df_filtered.columns else ('Part Type', 'count'),
+    grouped = aggregate(
+        df, filters, 'Part Type',
+        count=('Policy No', 'count') if 'Policy No' in df.columns else ('Part Type', 'count'),
+        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df.columns else ('Part Type', 'count'),
+        avgCost=('Total Auth Amount', 'mean') if 'Total Auth Amount' in df.columns else ('Part Type', 'count'),
     ).reset_index()
     grouped.columns = ['partType', 'count', 'totalAmount', 'avgCost']
     grouped = grouped.sort_values('count', ascending=False)
-    grouped = grouped.fillna(0) # Ensure no NaNs from avgCost
+    grouped = fill_missing(grouped) # Ensure no NaNs from avgCost
 
     return grouped.to_dict('records')
 
@@ -51,20 +51,20 @@ def get_claims_trends(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
 
-    if 'Year' not in df_filtered.columns or 'Month' not in df_filtered.columns:
+    if 'Year' not in df.columns or 'Month' not in df.columns:
         return []
 
-    grouped = df_filtered.groupby(['Year', 'Month']).agg(
-        count=('Policy No', 'count') if 'Policy No' in df_filtered.columns else ('Year', 'count'),
-        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df_filtered.columns else ('Year', 'count'),
-        laborCost=('Labor', 'sum') if 'Labor' in df_filtered.columns else ('Year', 'count'),
-        partsCost=('Parts', 'sum') if 'Parts' in df_filtered.columns else ('Year', 'count'),
+    grouped = aggregate(
+        df, filters, ['Year', 'Month'],
+        count=('Policy No', 'count') if 'Policy No' in df.columns else ('Year', 'count'),
+        totalAmount=('Total Auth Amount', 'sum') if 'Total Auth Amount' in df.columns else ('Year', 'count'),
+        laborCost=('Labor', 'sum') if 'Labor' in df.columns else ('Year', 'count'),
+        partsCost=('Parts', 'sum') if 'Parts' in df.columns else ('Year', 'count'),
     ).reset_index()
     grouped = grouped.sort_values(['Year', 'Month'])
     grouped['period'] = grouped['Year'].astype(str) + '-' + grouped['Month'].astype(str).str.zfill(2)
-    grouped = grouped.fillna(0)
+    grouped = fill_missing(grouped)
 
     return grouped.to_dict('records')
 
@@ -74,13 +74,13 @@ def get_claims_recent(df: pd.DataFrame, filters: dict = None, limit: int = 50) -
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
+    df_filtered = filter_view(df, filters)
 
     date_col = find_column(df_filtered, ['Failure Date', 'Authorized Date'])
     if date_col:
         df_filtered = df_filtered.sort_values(date_col, ascending=False)
 
-    result = df_filtered.head(limit).copy()
+    result = df_filtered.head(limit).frame()
     # Convert dates to strings
     for col in result.columns:
         if result[col].dtype == 'datetime64[ns]':
@@ -1,5 +1,5 @@
 import pandas as pd
-from backend.core.utils import find_column, apply_filters
+from backend.core.utils import aggregate, fill_missing, find_column, totals
 
 def get_summary(sales_df: pd.DataFrame, claims_df: pd.DataFrame, merged_df: pd.DataFrame, filters: dict = None) -> dict:
     """Get overall KPI summary."""
@@ -7,22 +7,32 @@ def get_summary(sales_df: pd.DataFrame, claims_df: pd.DataFrame, merged_df: pd.D
         return {}
 
     filters = filters or {}
-    sales = apply_filters(sales_df, filters)
-    if claims_df is None:
-        claims = pd.DataFrame()
-    else:
-        claims = apply_filters(claims_df, filters)
-
-    total_premium = float(sales['Gross Premium'].sum()) if 'Gross Premium' in sales.columns else 0
-    total_risk_premium = float(sales['Risk Premium'].sum()) if 'Risk Premium' in sales.columns else 0
-    total_claims_amount = float(claims['Total Auth Amount'].sum()) if 'Total Auth Amount' in claims.columns else 0
-    total_policies = len(sales)
-    total_claims = len(claims)
+    named = {'policies': ('_row_id', 'size')}
+    if 'Gross Premium' in sales_df.columns:
+        named['premium'] = ('Gross Premium', 'sum')
+    if 'Risk Premium' in sales_df.columns:
+        named['riskPremium'] = ('Risk Premium', 'sum')
+    for key, col in (('makes', 'Make'), ('dealers', 'Dealer')):
+        if col in sales_df.columns:
+            named[key] = (col, 'nunique')
+    sales = totals(sales_df, filters, **named)
+
+    claims = {}
+    if claims_df is not None:
+        named = {'claims': ('_row_id', 'size')}
+        if 'Total Auth Amount' in claims_df.columns:
+            named['amount'] = ('Total Auth Amount', 'sum')
+        claims = totals(claims_df, filters, **named)
+
+    total_premium = float(sales.get('premium', 0))
+    total_risk_premium = float(sales.get('riskPremium', 0))
+    total_claims_amount = float(claims.get('amount', 0))
+    total_policies = int(sales['policies'])
+    total_claims = int(claims.get('claims', 0))
 
     policies_with_claims = 0
     if merged_df is not None:
-        merged_filtered = apply_filters(merged_df, filters)
-        policies_with_claims = int(merged_filtered['has_claim'].sum())
+        policies_with_claims = int(totals(merged_df, filters, withClaims=('has_claim', 'sum'))['withClaims'])
 
     claim_rate = (policies_with_claims / total_policies * 100) if total_policies > 0 else 0
     loss_ratio = (total_claims_amount / total_premium * 100) if total_premium > 0 else 0
@@ -40,8 +50,8 @@ def get_summary(sales_df: pd.DataFrame, claims_df: pd.DataFrame, merged_df: pd.D
         'avgClaimCost': round(avg_claim_cost, 2),
         'avgPremium': round(avg_premium, 2),
         'policiesWithClaims': policies_with_claims,
-        'uniqueMakes': int(sales['Make'].nunique()) if 'Make' in sales.columns else 0,
-        'uniqueDealers': int(sales['Dealer'].nunique()) if 'Dealer' in sales.columns else 0,
+        'uniqueMakes': int(sales.get('makes', 0)),
+        'uniqueDealers': int(sales.get('dealers', 0)),
     }
 
 def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
@@ -50,7 +60,7 @@ def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
         return {}
 
     filters = filters or {}
-    df = apply_filters(merged_df, filters)
+    df = merged_df
     result = {}
 
     import pandas as pd
@@ -59,12 +69,13 @@ def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
 
     # Helper to clean df
     def clean_df(d):
-        return d.fillna(0).replace([np.inf, -np.inf], 0)
+        return fill_missing(d).replace([np.inf, -np.inf], 0)
 
     # Claim rate by dealer
     dealer_col = find_column(df, ['Dealer'])
     if dealer_col:
-        by_dealer = df.groupby(dealer_col).agg(
+        by_dealer = aggregate(
+            df, filters, dealer_col,
             policies=(dealer_col, 'count'),
             withClaims=('has_claim', 'sum'),
             totalPremium=('Gross Premium', 'sum') if 'Gross Premium' in df.columns else (dealer_col, 'count'),
@@ -79,7 +90,8 @@ def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
     # Claim rate by product
     prod_col = find_column(df, ['Product', 'Coverage'])
     if prod_col:
-        by_product = df.groupby(prod_col).agg(
+        by_product = aggregate(
+            df, filters, prod_col,
             policies=(prod_col, 'count'),
             withClaims=('has_claim', 'sum'),
             totalPremium=('Gross Premium', 'sum') if 'Gross Premium' in df.columns else (prod_col, 'count'),
@@ -93,7 +105,8 @@ def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
 
     # Claim rate by vehicle make (top 15)
     if 'Make' in df.columns:
-        by_make = df.groupby('Make').agg(
+        by_make = aggregate(
+            df, filters, 'Make',
             policies=('Make', 'count'),
             withClaims=('has_claim', 'sum'),
             totalPremium=('Gross Premium', 'sum') if 'Gross Premium' in df.columns else ('Make', 'count'),
@@ -106,7 +119,8 @@ def get_correlations(merged_df: pd.DataFrame, filters: dict = None) -> dict:
 
     # Claim rate by year
     if 'Year' in df.columns:
-        by_year = df.groupby('Year').agg(
+        by_year = aggregate(
+            df, filters, 'Year',
             policies=('Year', 'count'),
             withClaims=('has_claim', 'sum'),
             totalPremium=('Gross Premium', 'sum') if 'Gross Premium' in df.columns else ('Year', 'count'),
@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
-from backend.core.utils import apply_filters
+from backend.core.utils import aggregate
 
 def predict_loss_ratio(sales_df: pd.DataFrame, claims_df: pd.DataFrame, filters: dict = None) -> dict:
     """Predict future Loss Ratio using linear regression."""
@@ -11,15 +11,14 @@ def predict_loss_ratio(sales_df: pd.DataFrame, claims_df: pd.DataFrame, filters:
     filters = filters or {}
     # Apply filters but ignore date range to get full history for trend analysis if needed
     # For now, let's respect filters to predict based on selected segment
-    sales = apply_filters(sales_df, filters)
-    claims = apply_filters(claims_df, filters)
-
-    if 'Year' not in sales.columns or 'Month' not in sales.columns:
+    if 'Year' not in sales_df.columns or 'Month' not in sales_df.columns:
         return {'error': 'Missing time columns'}
 
     # Aggregate monthly
-    sales_monthly = sales.groupby(['Year', 'Month'])['Gross Premium'].sum().reset_index()
-    claims_monthly = claims.groupby(['Year', 'Month'])['Total Auth Amount'].sum().reset_index()
+    sales_monthly = aggregate(sales_df, filters, ['Year', 'Month'],
+                              **{'Gross Premium': ('Gross Premium', 'sum')}).reset_index()
+    claims_monthly = aggregate(claims_df, filters, ['Year', 'Month'],
+                               **{'Total Auth Amount': ('Total Auth Amount', 'sum')}).reset_index()
 
     merged = pd.merge(sales_monthly, claims_monthly, on=['Year', 'Month'], how='left')
     merged['Total Auth Amount'] = merged['Total Auth Amount'].fillna(0)
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from backend.core.utils import find_column, apply_filters
+from backend.core.utils import aggregate, fill_missing, find_column
 
 def get_sales_monthly(df: pd.DataFrame, filters: dict = None) -> list[dict]:
     """Monthly sales trends."""
@@ -8,21 +8,21 @@ def get_sales_monthly(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
 
-    if 'Year' not in df_filtered.columns or 'Month' not in df_filtered.columns:
+    if 'Year' not in df.columns or 'Month' not in df.columns:
         return []
 
-    grouped = df_filtered.groupby(['Year', 'Month']).agg(
+    grouped = aggregate(
+        df, filters, ['Year', 'Month'],
         premium=('Gross Premium', 'sum'),
         riskPremium=('Risk Premium', 'sum'),
-        policies=('Policy No', 'count') if 'Policy No' in df_filtered.columns else ('Year', 'count'),
+        policies=('Policy No', 'count') if 'Policy No' in df.columns else ('Year', 'count'),
     ).reset_index()
 
     grouped = grouped.sort_values(['Year', 'Month'])
     grouped['period'] = grouped['Year'].astype(str) + '-' + grouped['Month'].astype(str).str.zfill(2)
     
-    grouped = grouped.fillna(0) # Ensure no NaNs
+    grouped = fill_missing(grouped) # Ensure no NaNs
 
     return grouped.to_dict('records')
 
@@ -32,22 +32,22 @@ def get_sales_dealers(df: pd.DataFrame, merged_df: pd.DataFrame = None, filters:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
-    dealer_col = find_column(df_filtered, ['Dealer'])
+    dealer_col = find_column(df, ['Dealer'])
     if not dealer_col:
         return []
 
-    grouped = df_filtered.groupby(dealer_col).agg(
+    grouped = aggregate(
+        df, filters, dealer_col,
         premium=('Gross Premium', 'sum'),
         riskPremium=('Risk Premium', 'sum'),
-        policies=('Policy No', 'count') if 'Policy No' in df_filtered.columns else (dealer_col, 'count'),
+        policies=('Policy No', 'count') if 'Policy No' in df.columns else (dealer_col, 'count'),
     ).reset_index()
     grouped.columns = ['dealer', 'premium', 'riskPremium', 'policies']
 
     # Add claim info from merged
     if merged_df is not None:
-        merged_f = apply_filters(merged_df, filters)
-        dealer_claims = merged_f.groupby(dealer_col).agg(
+        dealer_claims = aggregate(
+            merged_df, filters, dealer_col,
             claimsCount=('has_claim', 'sum'),
             totalClaimAmount=('total_claim_amount', 'sum'),
         ).reset_index()
@@ -60,7 +60,7 @@ def get_sales_dealers(df: pd.DataFrame, merged_df: pd.DataFrame = None, filters:
         grouped['claimRate'] = np.where(grouped['policies'] > 0,
                                         (grouped['claimsCount'] / grouped['policies'] * 100).round(1), 0)
 
-    grouped = grouped.fillna(0)
+    grouped = fill_missing(grouped)
     return grouped.to_dict('records')
 
 def get_sales_products(df: pd.DataFrame, filters: dict = None) -> list[dict]:
@@ -69,19 +69,19 @@ def get_sales_products(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
-    prod_col = find_column(df_filtered, ['Product', 'Coverage'])
+    prod_col = find_column(df, ['Product', 'Coverage'])
     if not prod_col:
         return []
 
-    grouped = df_filtered.groupby(prod_col).agg(
+    grouped = aggregate(
+        df, filters, prod_col,
         premium=('Gross Premium', 'sum'),
         riskPremium=('Risk Premium', 'sum'),
-        count=('Policy No', 'count') if 'Policy No' in df_filtered.columns else (prod_col, 'count'),
+        count=('Policy No', 'count') if 'Policy No' in df.columns else (prod_col, 'count'),
     ).reset_index()
     grouped.columns = ['product', 'premium', 'riskPremium', 'count']
 
-    grouped = grouped.fillna(0)
+    grouped = fill_missing(grouped)
     return grouped.to_dict('records')
 
 def get_sales_vehicles(df: pd.DataFrame, filters: dict = None) -> list[dict]:
@@ -90,17 +90,17 @@ def get_sales_vehicles(df: pd.DataFrame, filters: dict = None) -> list[dict]:
         return []
 
     filters = filters or {}
-    df_filtered = apply_filters(df, filters)
 
-    if 'Make' not in df_filtered.columns:
+    if 'Make' not in df.columns:
         return []
 
-    grouped = df_filtered.groupby('Make').agg(
+    grouped = aggregate(
+        df, filters, 'Make',
         premium=('Gross Premium', 'sum'),
-        count=('Policy No', 'count') if 'Policy No' in df_filtered.columns else ('Make', 'count'),
+        count=('Policy No', 'count') if 'Policy No' in df.columns else ('Make', 'count'),
     ).reset_index()
     grouped.columns = ['make', 'premium', 'count']
     grouped = grouped.sort_values('count', ascending=False).head(20)
 
-    grouped = grouped.fillna(0)
+    grouped = fill_missing(grouped)
     return grouped.to_dict('records')
@@ -0,0 +1,91 @@
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+# Allow running as a plain script from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.data_manager import DataManager, POLICY_COLUMNS
+from backend.core.utils import find_column
+
+def verify(file_path='Sales&ClaimsData.xls', edits=500, seed=0):
+    """Apply random edits that move claims between policies and check merged_df after each batch."""
+    m = DataManager()
+    m.load_excel(file_path=file_path)
+    rng = random.Random(seed)
+
+    sales_policy = find_column(m.sales_df, POLICY_COLUMNS)
+    claims_policy = find_column(m.claims_df, POLICY_COLUMNS)
+    policies = m.sales_df[sales_policy].dropna().tolist() if sales_policy else []
+    sales_cols = [c for c in m.sales_df.columns if c != '_row_id']
+
+    def random_edit():
+        r = rng.random()
+        if r < 0.3 and claims_policy and policies:
+            row = rng.choice(m.claims_df['_row_id'].tolist())
+            return m.update_cell('claims', row, claims_policy, rng.choice(policies))
+        if r < 0.6 and 'Total Auth Amount' in m.claims_df.columns:
+            row = rng.choice(m.claims_df['_row_id'].tolist())
+            return m.update_cell('claims', row, 'Total Auth Amount', round(rng.uniform(0, 5000), 2))
+        if r < 0.75 and sales_policy and policies:
+            row = rng.choice(m.sales_df['_row_id'].tolist())
+            return m.update_cell('sales', row, sales_policy, rng.choice(policies))
+        col = rng.choice(sales_cols)
+        row = rng.choice(m.sales_df['_row_id'].tolist())
+        values = m.sales_df[col].dropna()
+        if values.empty:
+            return None
+        value = values.iloc[rng.randrange(len(values))]
+        return m.update_cell('sales', row, col, str(value.date()) if hasattr(value, 'date') else value)
+
+    t0 = time.time()
+    failures = 0
+    for i in range(1, edits + 1):
+        random_edit()
+        if i % 50 == 0 or i == edits:
+            problems = m.check_merged()
+            if problems:
+                failures += 1
+                print(f"FAILURE after {i} edits:")
+                for p in problems:
+                    print(f"   {p}")
+    elapsed = time.time() - t0
+    dates_ok = verify_date_edits(m, rng)
+
+    if failures:
+        print(f"FAILURE: merged_df drifted from a full rebuild ({failures} checks failed)")
+    elif dates_ok:
+        print(f"SUCCESS: merged_df matches a full rebuild after {edits} edits ({elapsed:.2f}s)")
+    return failures == 0 and dates_ok
+
+def verify_date_edits(m, rng):
+    """Edit a date cell singly and in a batch; results and change log must be stored and JSON-ready."""
+    date_cols = [c for c in m.sales_df.columns if pd.api.types.is_datetime64_any_dtype(m.sales_df[c])]
+    if not date_cols:
+        return True
+    col = date_cols[0]
+    rows = m.sales_df['_row_id'].tolist()
+    ok = True
+    for value in ('2021-03-04', '2022-11-30'):
+        row = rng.choice(rows)
+        results = [m.update_cell('sales', row, col, value),
+                   m.bulk_update('sales', [{'row_id': row, 'column': col, 'new_value': value}])]
+        stored = m.get_row('sales', row)
+        try:
+            # Plain json, as jsonable_encoder would: numpy scalars must not leak out
+            json.dumps([results, m.change_log[-2:], stored])
+        except TypeError as e:
+            print(f"FAILURE: editing date column {col!r} returned unencodable values: {e}")
+            ok = False
+        if not stored or str(stored.get(col))[:10] != value:
+            print(f"FAILURE: {col!r} of row {row} reads {stored and stored.get(col)!r} after setting {value}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    ok = verify(*sys.argv[1:2])
+    sys.exit(0 if ok else 1)
@@ -1,6 +1,6 @@
 "use client";
 
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import {
   Search,
   ChevronLeft,
@@ -153,10 +153,13 @@ export function DataManagerView({ data }: DataManagerViewProps) {
   const [tableData, setTableData] = useState<{
     rows: Record<string, unknown>[];
     columns: string[];
-    total: number;
-    pages: number;
-  }>({ rows: [], columns: [], total: 0, pages: 0 });
+    hasNext: boolean;
+  }>({ rows: [], columns: [], hasNext: false });
+  const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(false);
+  // cursors.current[i] opens page i + 1 of the current listing
+  const cursors = useRef<(string | null)[]>([null]);
+  const pages = Math.max(1, Math.ceil(total / limit));
 
   // Editing state
   const [editingCell, setEditingCell] = useState<{
@@ -169,18 +172,32 @@ export function DataManagerView({ data }: DataManagerViewProps) {
   const [changeLog, setChangeLog] = useState<Record<string, unknown>[]>([]);
   const [editedCells, setEditedCells] = useState<Set<string>>(new Set());
 
+  // A new tab, search, sort or filter set starts a new listing: its cursors don't carry over
+  useEffect(() => {
+    cursors.current = [null];
+    setPage(1);
+  }, [activeTab, search, sortBy, sortDir, data.scrollRawData]);
+
   const fetchData = useCallback(async () => {
+    const cursor = cursors.current[page - 1];
+    // Page reset pending after the listing changed
+    if (cursor === undefined) return;
     setLoading(true);
     try {
-      const result = await data.getRawData(
+      const result = await data.scrollRawData(
         activeTab,
-        page,
+        cursor,
         limit,
         sortBy,
         sortDir,
         { search },
       );
-      setTableData(result);
+      cursors.current = [...cursors.current.slice(0, page), result.nextCursor];
+      setTableData({
+        rows: result.rows,
+        columns: result.columns,
+        hasNext: result.nextCursor !== null,
+      });
     } catch (err) {
       console.error("Failed to fetch data:", err);
     } finally {
@@ -188,13 +205,21 @@ export function DataManagerView({ data }: DataManagerViewProps) {
     }
   }, [data, activeTab, page, limit, sortBy, sortDir, search]);
 
+  const fetchTotal = useCallback(async () => {
+    try {
+      setTotal(await data.countRawData(activeTab, { search }));
+    } catch (err) {
+      console.error("Failed to count rows:", err);
+    }
+  }, [data, activeTab, search]);
+
   useEffect(() => {
     fetchData();
   }, [fetchData]);
 
   useEffect(() => {
-    setPage(1);
-  }, [activeTab, search]);
+    fetchTotal();
+  }, [fetchTotal]);
 
   const handleSort = (col: string) => {
     if (sortBy === col) {
@@ -232,6 +257,7 @@ export function DataManagerView({ data }: DataManagerViewProps) {
         );
         cancelEdit();
         fetchData();
+        fetchTotal();
       } else {
         setEditError(result.error || "Update failed");
       }
@@ -249,6 +275,7 @@ export function DataManagerView({ data }: DataManagerViewProps) {
       await data.resetData();
       setEditedCells(new Set());
       fetchData();
+      fetchTotal();
     }
   };
 
@@ -280,7 +307,7 @@ export function DataManagerView({ data }: DataManagerViewProps) {
             <h1 className="text-xl font-bold text-foreground">Data Manager</h1>
             <p className="text-xs text-muted-foreground mt-0.5">
               View, search, edit, and export your data •{" "}
-              {tableData.total.toLocaleString()} rows
+              {total.toLocaleString()} rows
             </p>
           </div>
           <div className="flex items-center gap-2">
@@ -406,8 +433,8 @@ export function DataManagerView({ data }: DataManagerViewProps) {
       <div className="px-6 py-3 border-t border-border bg-card/50 flex items-center justify-between">
         <p className="text-[11px] text-muted-foreground">
           Showing {((page - 1) * limit + 1).toLocaleString()}–
-          {Math.min(page * limit, tableData.total).toLocaleString()} of{" "}
-          {tableData.total.toLocaleString()}
+          {Math.min(page * limit, total).toLocaleString()} of{" "}
+          {total.toLocaleString()}
         </p>
         <div className="flex items-center gap-2">
           <button
@@ -418,10 +445,10 @@ export function DataManagerView({ data }: DataManagerViewProps) {
             <ChevronLeft size={14} />
           </button>
           <span className="text-xs font-medium px-2">
-            {page} / {tableData.pages}
+            {page} / {pages}
           </span>
           <button
-            disabled={page >= tableData.pages}
+            disabled={!tableData.hasNext}
             onClick={() => setPage((p) => p + 1)}
             className="p-1.5 rounded-lg border border-border hover:bg-muted disabled:opacity-30 transition-colors"
           >
@@ -171,6 +171,48 @@ export interface RawDataResult {
   limit: number;
 }
 
+export interface RawDataScroll {
+  rows: Record<string, unknown>[];
+  columns: string[];
+  /** Pass back to get the next page; null on the last one. */
+  nextCursor: string | null;
+  limit: number;
+}
+
+export interface DashboardResponse {
+  summary?: KPIs;
+  filterOptions?: FilterOptions;
+  salesMonthly?: SalesMonthly[];
+  salesDealers?: DealerPerf[];
+  salesProducts?: ProductMix[];
+  salesVehicles?: VehicleMix[];
+  claimStatuses?: ClaimStatus[];
+  claimParts?: PartAnalysis[];
+  claimTrends?: ClaimTrend[];
+  recentClaims?: Record<string, unknown>[];
+  correlations?: Correlations;
+  insights?: Insight[];
+  validation?: ValidationResult;
+  errors: Record<string, string>;
+}
+
+/** A record list sent with `format=columnar`: field names once, then one array per field. */
+export interface Columnar {
+  columns: string[];
+  data: Record<string, unknown[]>;
+}
+
+type ChartWidget =
+  | "salesMonthly" | "salesDealers" | "salesProducts" | "salesVehicles"
+  | "claimStatuses" | "claimParts" | "claimTrends";
+
+/** `/api/dashboard?format=columnar`: chart widgets (and each correlations series) arrive columnar. */
+type ColumnarDashboard = Omit<DashboardResponse, ChartWidget | "correlations"> & {
+  [K in ChartWidget]?: Columnar;
+} & {
+  correlations?: Partial<Record<keyof Correlations, Columnar>>;
+};
+
 export interface WidgetSuggestion {
   type: string;
   title: string;
@@ -202,20 +244,63 @@ function buildQuery(filters: Filters): string {
   return qs ? `?${qs}` : "";
 }
 
-async function apiFetch<T>(path: string, options?: RequestInit): Promise<T> {
+/** Rebuild the records of a `format=columnar` series. */
+export function fromColumnar<T>(table: Columnar | undefined): T[] {
+  if (!table || table.columns.length === 0) return [];
+  const { columns, data } = table;
+  const length = data[columns[0]].length;
+  const rows = new Array<T>(length);
+  for (let i = 0; i < length; i++) {
+    const row: Record<string, unknown> = {};
+    for (const col of columns) row[col] = data[col][i];
+    rows[i] = row as T;
+  }
+  return rows;
+}
+
+// Newest data version reported by the server run (X-Data-Run) that answered last.
+// Versions restart with each server process and differ between processes that
+// don't share data, so they are only compared within one run.
+let dataRun = "";
+let latestDataVersion = 0;
+
+// Re-requests of a dashboard computed from data that changed meanwhile
+const STALE_RETRIES = 2;
+
+/** Whether a result was computed from data older than the newest seen in its run. */
+function isStale(run: string, version: number): boolean {
+  return run === dataRun && version < latestDataVersion;
+}
+
+async function apiFetchVersioned<T>(
+  path: string,
+  options?: RequestInit,
+): Promise<{ data: T; version: number; run: string }> {
   const res = await fetch(`${API_BASE}${path}`, options);
   if (!res.ok) {
     const err = await res.text();
     throw new Error(err);
   }
+  const version = Number(res.headers.get("x-data-version") ?? 0);
+  const run = res.headers.get("x-data-run") ?? "";
+  if (run !== dataRun) {
+    dataRun = run;
+    latestDataVersion = version;
+  } else {
+    latestDataVersion = Math.max(latestDataVersion, version);
+  }
   const contentType = res.headers.get("content-type");
   if (contentType && contentType.includes("application/json")) {
-    return res.json();
+    return { data: await res.json(), version, run };
   }
   const text = await res.text();
   throw new Error(`Expected JSON but received: ${text.slice(0, 100)}...`);
 }
 
+async function apiFetch<T>(path: string, options?: RequestInit): Promise<T> {
+  return (await apiFetchVersioned<T>(path, options)).data;
+}
+
 // ─── Hook ────────────────────────────────────────────────
 
 export function useData(filters: Filters = {}) {
@@ -300,28 +385,20 @@ export function useData(filters: Filters = {}) {
     const qs = buildQuery(f);
 
     try {
-      // Use allSettled so one failing endpoint doesn't block everything
-      const results = await Promise.allSettled([
-        apiFetch<KPIs>(`/api/summary${qs}`),
-        apiFetch<FilterOptions>("/api/filters"),
-        apiFetch<SalesMonthly[]>(`/api/sales/monthly${qs}`),
-        apiFetch<DealerPerf[]>(`/api/sales/dealers${qs}`),
-        apiFetch<ProductMix[]>(`/api/sales/products${qs}`),
-        apiFetch<VehicleMix[]>(`/api/sales/vehicles${qs}`),
-        apiFetch<ClaimStatus[]>(`/api/claims/status${qs}`),
-        apiFetch<PartAnalysis[]>(`/api/claims/parts${qs}`),
-        apiFetch<ClaimTrend[]>(`/api/claims/trends${qs}`),
-        apiFetch<Record<string, unknown>[]>(`/api/claims/recent${qs}`),
-        apiFetch<Correlations>(`/api/correlations${qs}`),
-        apiFetch<Insight[]>(`/api/insights${qs}`),
-        apiFetch<ValidationResult>("/api/validate"),
-      ]);
-
-      // If a newer fetch was started, discard this one
-      if (myFetchId !== fetchIdRef.current) return;
-
-      const val = <T,>(r: PromiseSettledResult<T>, fallback: T): T =>
-        r.status === "fulfilled" ? r.value : fallback;
+      // One batched request; widgets that failed server-side are listed in `errors`.
+      // Chart series come columnar: each field name is sent once instead of once per row
+      let data: ColumnarDashboard;
+      let version: number;
+      let run: string;
+      let retries = 0;
+      do {
+        ({ data, version, run } = await apiFetchVersioned<ColumnarDashboard>(
+          `/api/dashboard${qs ? `${qs}&` : "?"}format=columnar`,
+        ));
+        // If a newer fetch was started, discard this one
+        if (myFetchId !== fetchIdRef.current) return;
+        // Data changed while this was computed (an edit or upload elsewhere): ask again, a few times at most
+      } while (isStale(run, version) && retries++ < STALE_RETRIES);
 
       const emptyFilterOpts: FilterOptions = {
         dealers: [], products: [], years: [], months: [], makes: [],
@@ -329,25 +406,27 @@ export function useData(filters: Filters = {}) {
         claimStatuses: [], partTypes: [],
       };
 
-      setKpis(val(results[0] as PromiseSettledResult<KPIs>, null));
-      setFilterOptions(val(results[1] as PromiseSettledResult<FilterOptions>, emptyFilterOpts));
-      setSalesMonthly(val(results[2] as PromiseSettledResult<SalesMonthly[]>, []));
-      setSalesDealers(val(results[3] as PromiseSettledResult<DealerPerf[]>, []));
-      setSalesProducts(val(results[4] as PromiseSettledResult<ProductMix[]>, []));
-      setSalesVehicles(val(results[5] as PromiseSettledResult<VehicleMix[]>, []));
-      setClaimStatuses(val(results[6] as PromiseSettledResult<ClaimStatus[]>, []));
-      setClaimParts(val(results[7] as PromiseSettledResult<PartAnalysis[]>, []));
-      setClaimTrends(val(results[8] as PromiseSettledResult<ClaimTrend[]>, []));
-      setRecentClaims(val(results[9] as PromiseSettledResult<Record<string, unknown>[]>, []));
-      setCorrelations(val(results[10] as PromiseSettledResult<Correlations>, {}));
-      setInsights(val(results[11] as PromiseSettledResult<Insight[]>, []));
-      setValidation(val(results[12] as PromiseSettledResult<ValidationResult>, null));
+      setKpis(data.summary ?? null);
+      setFilterOptions(data.filterOptions ?? emptyFilterOpts);
+      setSalesMonthly(fromColumnar<SalesMonthly>(data.salesMonthly));
+      setSalesDealers(fromColumnar<DealerPerf>(data.salesDealers));
+      setSalesProducts(fromColumnar<ProductMix>(data.salesProducts));
+      setSalesVehicles(fromColumnar<VehicleMix>(data.salesVehicles));
+      setClaimStatuses(fromColumnar<ClaimStatus>(data.claimStatuses));
+      setClaimParts(fromColumnar<PartAnalysis>(data.claimParts));
+      setClaimTrends(fromColumnar<ClaimTrend>(data.claimTrends));
+      setRecentClaims(data.recentClaims ?? []);
+      setCorrelations(
+        Object.fromEntries(
+          Object.entries(data.correlations ?? {}).map(([key, series]) => [key, fromColumnar(series)]),
+        ) as Correlations,
+      );
+      setInsights(data.insights ?? []);
+      setValidation(data.validation ?? null);
 
       // Log any individual failures for debugging
-      results.forEach((r, i) => {
-        if (r.status === "rejected") {
-          console.warn(`API call ${i} failed:`, r.reason);
-        }
+      Object.entries(data.errors ?? {}).forEach(([widget, reason]) => {
+        console.warn(`Dashboard widget ${widget} failed:`, reason);
       });
     } catch (err) {
       console.error("Failed to fetch data:", err);
@@ -489,6 +568,47 @@ export function useData(filters: Filters = {}) {
     [filters],
   );
 
+  const rawDataParams = useCallback(
+    (extraFilters?: Filters) => {
+      const params = new URLSearchParams();
+      Object.entries({ ...filters, ...extraFilters }).forEach(([k, v]) => {
+        if (v && v !== "All" && v !== "") params.set(k, v);
+      });
+      return params;
+    },
+    [filters],
+  );
+
+  // Keyset pages: each page's nextCursor resumes after its last row
+  const scrollRawData = useCallback(
+    async (
+      table: string,
+      cursor: string | null,
+      limit: number = 100,
+      sortBy?: string,
+      sortDir?: string,
+      extraFilters?: Filters,
+    ): Promise<RawDataScroll> => {
+      const params = rawDataParams(extraFilters);
+      if (cursor) params.set("cursor", cursor);
+      params.set("limit", String(limit));
+      if (sortBy) params.set("sort_by", sortBy);
+      if (sortDir) params.set("sort_dir", sortDir);
+
+      return apiFetch<RawDataScroll>(`/api/data/${table}/scroll?${params.toString()}`);
+    },
+    [rawDataParams],
+  );
+
+  const countRawData = useCallback(
+    async (table: string, extraFilters?: Filters): Promise<number> => {
+      const params = rawDataParams(extraFilters);
+      const result = await apiFetch<{ total: number }>(`/api/data/${table}/count?${params.toString()}`);
+      return result.total;
+    },
+    [rawDataParams],
+  );
+
   // ─── Inline editing ────────────────────────────────────
 
   const updateCell = useCallback(
@@ -510,8 +630,8 @@ export function useData(filters: Filters = {}) {
         setPendingChanges((p) => p + 1);
         // Refresh KPIs
         const qs = buildQuery(filters);
-        const newKpis = await apiFetch<KPIs>(`/api/summary${qs}`);
-        setKpis(newKpis);
+        const { data: newKpis, version, run } = await apiFetchVersioned<KPIs>(`/api/summary${qs}`);
+        if (!isStale(run, version)) setKpis(newKpis);
       }
       return result;
     },
@@ -602,6 +722,8 @@ export function useData(filters: Filters = {}) {
     handleFileUpload,
     fetchAllData,
     getRawData,
+    scrollRawData,
+    countRawData,
     updateCell,
     resetData,
     getChangeLog,